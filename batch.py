@@ -0,0 +1,220 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# streamlit / plotly / kaleido 는 절대 임포트하지 않음 (워커 프로세스 기동 비용)
+from engine import BOX_MARGINS, PalletLogic, ResultCache, merge_shard_stats, merge_shards, normalize_search_params, parse_dimensions, pareto_objectives
+
+# python batch.py skus.csv results.jsonl --workers 8
+#
+# 입력 컬럼 (CSV 헤더 또는 JSONL 키), 없으면 UI 기본값 사용:
+#   sku, dims("180,120,50"), weight(g), box_type(0/1/2 또는 A/B/AB), min_qty, max_qty,
+#   pallet("1100,1100,1650"), rotation, stack_limit, max_box_weight(g),
+#   min_layer_qty, max_layer_qty, single_item, block_layers,
+#   pareto (1 = total,sf,efficiency / "total,sf,efficiency,boxes" 처럼 목적 지정, 비우면 점수 상위 12)
+
+DEFAULTS = {
+    'weight': 5.0, 'box_type': 0, 'min_qty': 10, 'max_qty': 100, 'pallet': "1100,1100,1650",
+    'rotation': True, 'stack_limit': 6, 'max_box_weight': 10000,
+    'min_layer_qty': 4, 'max_layer_qty': 0, 'single_item': False, 'block_layers': False, 'pareto': "",
+}
+BOX_TYPE_NAMES = {'A': 0, 'B': 1, 'AB': 2}
+
+# ==========================================
+# 1. 입력 파싱
+# ==========================================
+def iter_rows(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if path.lower().endswith(('.jsonl', '.ndjson')):
+            for line_no, line in enumerate(f, 1):
+                if not line.strip(): continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    row = {'_error': f"invalid json: {e}"}
+                row.setdefault('sku', f"line{line_no}")
+                yield row
+        else:
+            for line_no, row in enumerate(csv.DictReader(f), 2):
+                row = {k.strip().lower(): v for k, v in row.items() if k}
+                if not row.get('sku'): row['sku'] = f"line{line_no}"
+                yield row
+
+def _value(row, key):
+    v = row.get(key)
+    if v is None or (isinstance(v, str) and not v.strip()): return DEFAULTS[key]
+    return v
+
+def _flag(v):
+    if isinstance(v, str): return v.strip().lower() in ("1", "true", "y", "yes", "o")
+    return bool(v)
+
+def row_to_params(row):
+    if '_error' in row: raise ValueError(row['_error'])
+    dims_src = row.get('dims') or ",".join(str(row.get(k, '')) for k in ('l', 'w', 'h'))
+    p_dims = parse_dimensions(dims_src)
+    if not p_dims: raise ValueError(f"invalid dims: {dims_src!r}")
+    pallet = parse_dimensions(_value(row, 'pallet'))
+    if not pallet: raise ValueError(f"invalid pallet: {row.get('pallet')!r}")
+
+    box_type = _value(row, 'box_type')
+    box_type_idx = BOX_TYPE_NAMES.get(str(box_type).strip().upper())
+    if box_type_idx is None: box_type_idx = int(float(box_type))
+    if not 0 <= box_type_idx < len(BOX_MARGINS): raise ValueError(f"invalid box_type: {box_type!r}")
+
+    min_qty, max_qty = int(float(_value(row, 'min_qty'))), int(float(_value(row, 'max_qty')))
+    if _flag(_value(row, 'single_item')): min_qty = max_qty = 1
+
+    return (p_dims, float(_value(row, 'weight')), int(float(_value(row, 'max_box_weight'))),
+            box_type_idx, BOX_MARGINS[box_type_idx], min_qty, max_qty, tuple(pallet),
+            _flag(_value(row, 'rotation')), int(float(_value(row, 'stack_limit'))),
+            int(float(_value(row, 'min_layer_qty'))), int(float(_value(row, 'max_layer_qty'))),
+            _flag(_value(row, 'block_layers')), pareto_objectives(_value(row, 'pareto')))
+
+# ==========================================
+# 2. 워커
+# ==========================================
+_worker_sim = None
+_worker_cache = None
+
+def _init_worker(cache_dir):
+    global _worker_sim, _worker_cache
+    _worker_sim = PalletLogic()
+    _worker_cache = ResultCache(disk_dir=cache_dir) if cache_dir else None
+
+def run_params(params, top_n):
+    # 워커 1건 (batch / server 공용)
+    t0 = time.perf_counter()
+    stats = {}
+    params = normalize_search_params(*params)  # 캐시 유무와 관계없이 같은 검색 (회전 허용이면 정렬된 치수)
+    if _worker_cache: candidates = _worker_cache.find_candidates(_worker_sim, *params, stats=stats)
+    else:
+        candidates = _worker_sim.find_candidates_np(*params)
+        stats = _worker_sim.search_stats
+    return {'n': len(candidates),
+            'candidates': [c.to_dict() for c in (candidates[:top_n] if top_n else candidates)],
+            'ms': round((time.perf_counter() - t0) * 1000, 1), 'search': stats}
+
+def run_shard(params, shard):
+    # 병렬 단일 질의의 샤드 1개 (find_candidates_np shard 모드, 워커의 _pre 재사용)
+    sim = _worker_sim or PalletLogic()
+    entries = sim.find_candidates_np(*normalize_search_params(*params), shard=shard)
+    return entries, sim.search_stats
+
+def merge_run(parts, params, top_n, ms):
+    # run_shard 결과들 -> run_params 와 같은 모양
+    candidates = merge_shards([p[0] for p in parts], pareto=params[13])
+    stats = merge_shard_stats([p[1] for p in parts])
+    stats['emitted'] = len(candidates)
+    return {'n': len(candidates),
+            'candidates': [c.to_dict() for c in (candidates[:top_n] if top_n else candidates)],
+            'ms': round(ms, 1), 'search': stats}
+
+def run_params_parallel(pool, params, top_n, shards):
+    t0 = time.perf_counter()
+    futures = [pool.submit(run_shard, params, (i, shards)) for i in range(shards)]
+    return merge_run([f.result() for f in futures], params, top_n, (time.perf_counter() - t0) * 1000)
+
+def run_chunk(rows, top_n):
+    out = []
+    for row in rows:
+        sku = str(row.get('sku'))
+        try:
+            res = run_params(row_to_params(row), top_n)
+            out.append({'sku': sku, 'status': 'ok', 'n': res['n'], 'candidates': res['candidates'], 'ms': res['ms']})
+        except Exception as e:
+            out.append({'sku': sku, 'status': 'error', 'error': f"{type(e).__name__}: {e}"})
+    return out
+
+# ==========================================
+# 3. 실행 (스트리밍 출력 + 이어하기)
+# ==========================================
+def load_done(out_path, retry_errors):
+    done = set()
+    if not os.path.exists(out_path): return done
+    with open(out_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # 중단 시 잘린 마지막 줄
+            if retry_errors and rec.get('status') != 'ok': continue
+            done.add(str(rec.get('sku')))
+    return done
+
+def iter_chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk: yield chunk
+
+def run_batch(in_path, out_path, workers=None, chunk_size=16, top_n=0, cache_dir=None, retry_errors=False, log=sys.stderr):
+    workers = workers or os.cpu_count() or 1
+    done = load_done(out_path, retry_errors)
+    pending_rows = (row for row in iter_rows(in_path) if str(row.get('sku')) not in done)
+    chunks = iter_chunks(pending_rows, chunk_size)
+    max_in_flight = workers * 2
+
+    n_ok = n_err = 0
+    t_start = time.perf_counter()
+    if done: print(f"resume: skipping {len(done)} finished SKUs", file=log)
+
+    # 잘린 마지막 줄이 있으면 줄바꿈으로 분리
+    if os.path.exists(out_path) and os.path.getsize(out_path) > 0:
+        with open(out_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b"\n"
+    else:
+        needs_newline = False
+
+    with open(out_path, 'a', encoding='utf-8') as out, \
+         ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_dir,)) as pool:
+        if needs_newline: out.write("\n")
+        in_flight = set()
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < max_in_flight:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                in_flight.add(pool.submit(run_chunk, chunk, top_n))
+            if not in_flight: break
+
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                for rec in fut.result():
+                    out.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                    if rec['status'] == 'ok': n_ok += 1
+                    else: n_err += 1
+            out.flush()
+            elapsed = time.perf_counter() - t_start
+            print(f"\r{n_ok + n_err} done ({n_err} errors) {elapsed:.1f}s", end="", file=log, flush=True)
+
+    print(file=log)
+    return n_ok, n_err
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Headless batch runner for PalletLogic.find_candidates")
+    ap.add_argument("input", help="CSV or JSONL file with one SKU per row")
+    ap.add_argument("output", help="JSONL results file (appended, resumable)")
+    ap.add_argument("--workers", type=int, default=None, help="process count (default: all cores)")
+    ap.add_argument("--chunk-size", type=int, default=16, help="SKUs per worker task")
+    ap.add_argument("--top", type=int, default=0, help="keep only the first N candidates per SKU (0 = all)")
+    ap.add_argument("--cache-dir", default=None, help="shared on-disk result cache directory")
+    ap.add_argument("--retry-errors", action="store_true", help="re-run SKUs that previously failed")
+    args = ap.parse_args(argv)
+
+    n_ok, n_err = run_batch(args.input, args.output, args.workers, args.chunk_size, args.top, args.cache_dir, args.retry_errors)
+    print(f"ok={n_ok} errors={n_err}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from engine import BOX_MARGINS, PalletLogic
+
+# python bench.py                                   # quick 매트릭스 -> bench_results.json
+# python bench.py --matrix full --repeat 5 --out after.json
+# python bench.py --compare before.json --max-slowdown 1.25   # 느려진 항목이 있으면 exit 1
+#
+# 기록: 시나리오별 wall time(min/median ms), tracemalloc 최대 메모리(KB), 후보 수, 결과 해시
+# engine/batch import 가 --import-budget-ms 를 넘거나 streamlit/plotly 등을 끌어오면 exit 1
+
+PRODUCTS = {'tiny': (40, 30, 20), 'medium': (180, 120, 50), 'large': (300, 200, 150)}
+PALLETS = {'1100': (1100, 1100, 1650), 'EUR': (1200, 800, 1650), 'ISO': (1200, 1000, 1650)}
+QTY_RANGES = {'default': (10, 100), 'wide': (1, 300), 'narrow': (20, 40)}
+LAYER_RANGES = {'default': (4, 0), 'wide': (1, 0), 'narrow': (6, 12)}
+BASE = {'product': 'medium', 'pallet': '1100', 'rotation': True, 'single_item': False,
+        'qty': 'default', 'layers': 'default'}
+ENGINES = {'py': 'find_candidates', 'np': 'find_candidates_np'}
+
+# import 시간: LIGHT_MODULES 는 예산 안에 들어야 하고 HEAVY_MODULES 를 끌어오면 안 됨
+IMPORT_MODULES = ('engine', 'batch', 'viz', 'report')
+LIGHT_MODULES = ('engine', 'batch')
+HEAVY_MODULES = ('streamlit', 'plotly', 'kaleido', 'fpdf')
+
+# 그림/PDF 는 이 시나리오들의 1순위 후보로 측정
+FIGURE_SCENARIOS = ['medium/1100/rot/qty-default/layers-default', 'tiny/EUR/rot/qty-default/layers-default']
+
+# ==========================================
+# 1. 시나리오
+# ==========================================
+def scenario_name(s):
+    rot = "rot" if s['rotation'] else "norot"
+    qty = "single" if s['single_item'] else f"qty-{s['qty']}"
+    return f"{s['product']}/{s['pallet']}/{rot}/{qty}/layers-{s['layers']}"
+
+def scenario_params(s, weight=5.0, box_type_idx=0, max_box_w=10000, stack_limit=6):
+    min_qty, max_qty = QTY_RANGES[s['qty']]
+    if s['single_item']: min_qty = max_qty = 1
+    min_lq, max_lq = LAYER_RANGES[s['layers']]
+    return (PRODUCTS[s['product']], weight, max_box_w, box_type_idx, BOX_MARGINS[box_type_idx],
+            min_qty, max_qty, PALLETS[s['pallet']], s['rotation'], stack_limit, min_lq, max_lq)
+
+def build_matrix(kind):
+    out = []
+    if kind == 'full':
+        for prod, pal, rot, single, qty, layers in itertools.product(
+                PRODUCTS, PALLETS, (True, False), (False, True), QTY_RANGES, LAYER_RANGES):
+            if single and qty != 'default': continue  # 단품은 수량 범위 무시
+            out.append({'product': prod, 'pallet': pal, 'rotation': rot, 'single_item': single,
+                        'qty': qty, 'layers': layers})
+    else:
+        # 제품 x 파레트 + medium 기준 한 축씩 변경
+        for prod, pal in itertools.product(PRODUCTS, PALLETS):
+            out.append(dict(BASE, product=prod, pallet=pal))
+        for change in ({'rotation': False}, {'single_item': True}, {'qty': 'wide'}, {'qty': 'narrow'},
+                       {'layers': 'wide'}, {'layers': 'narrow'}):
+            out.append(dict(BASE, **change))
+    seen, uniq = set(), []
+    for s in out:
+        if scenario_name(s) in seen: continue
+        seen.add(scenario_name(s))
+        uniq.append(s)
+    return uniq
+
+# ==========================================
+# 2. 측정
+# ==========================================
+def measure(fn, repeat):
+    fn()  # 워밍업 (import/캐시 영향 제거)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    # 메모리는 별도 1회 (tracemalloc 이 시간 측정을 왜곡하므로)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return out, {'min_ms': round(min(times), 3), 'median_ms': round(statistics.median(times), 3),
+                 'peak_kb': round(peak / 1024, 1)}
+
+def result_hash(candidates):
+    h = hashlib.sha1()
+    for c in candidates: h.update(c.fingerprint().encode())
+    return h.hexdigest()[:16]
+
+def bench_search(matrix, engines, repeat, log):
+    sim = PalletLogic()
+    rows, tops = [], {}
+    for s in matrix:
+        name, params = scenario_name(s), scenario_params(s)
+        for engine in engines:
+            runs = [(engine, lambda: getattr(sim, ENGINES[engine])(*params))]
+            if engine == 'np':
+                # np = 매번 새 PalletLogic (전처리 _pre 까지 포함), np-reuse = 같은 sim 에서 _pre 재사용
+                runs = [('np', lambda: PalletLogic().find_candidates_np(*params)),
+                        ('np-reuse', lambda: sim.find_candidates_np(*params))]
+            for label, fn in runs:
+                candidates, stats = measure(fn, repeat)
+                row = dict({'section': 'search', 'name': name, 'engine': label, 'scenario': s,
+                            'candidates': len(candidates), 'result_hash': result_hash(candidates)}, **stats)
+                if engine == 'py': row['search_stats'] = dict(sim.search_stats)
+                rows.append(row)
+                if candidates: tops.setdefault(name, (candidates[0], params))
+                print(f"  search {label:8s} {name:45s} {stats['median_ms']:9.2f} ms  {len(candidates):3d} cand", file=log)
+    return rows, tops
+
+def bench_figures(tops, repeat, pdf, log):
+    try:
+        import viz
+        import report
+        from translations import TRANSLATIONS
+    except ImportError as e:
+        print(f"  figures skipped: {e}", file=log)
+        return [{'section': 'figure', 'name': 'skipped', 'error': str(e)}]
+
+    rows = []
+    t = TRANSLATIONS["🇺🇸"]
+    renderer = report.ReportRenderer() if pdf else None
+    for name in FIGURE_SCENARIOS:
+        if name not in tops: continue
+        res, params = tops[name]
+        pallet_dims = params[7]
+        for kind, builder in viz.FIGURE_BUILDERS.items():
+            fig, stats = measure(lambda: builder(res, pallet_dims, t), repeat)
+            rows.append(dict({'section': 'figure', 'name': name, 'kind': kind,
+                              'json_bytes': viz.figure_nbytes(fig)}, **stats))
+            print(f"  figure {kind:9s} {name:45s} {stats['median_ms']:9.2f} ms", file=log)
+        if not pdf: continue
+        make_pdf = lambda: report.create_pdf_report(res, params[0], pallet_dims, params[1], "🇺🇸", renderer=renderer)
+        t0 = time.perf_counter()
+        try:
+            make_pdf()  # 첫 호출 = 글꼴 파싱 포함
+        except Exception as e:
+            rows.append({'section': 'pdf', 'name': name, 'error': f"{type(e).__name__}: {e}"})
+            continue
+        cold_ms = (time.perf_counter() - t0) * 1000
+        (pdf_bytes, _), stats = measure(make_pdf, max(1, repeat // 2))
+        rows.append(dict({'section': 'pdf', 'name': name, 'cold_ms': round(cold_ms, 3),
+                          'pdf_bytes': len(pdf_bytes)}, **stats))
+        print(f"  pdf              {name:45s} {stats['median_ms']:9.2f} ms (cold {cold_ms:.0f} ms)", file=log)
+    return rows
+
+def bench_imports(repeat, log):
+    # 새 인터프리터마다 import 만 측정 (인터프리터 기동 시간 제외)
+    rows = []
+    here = os.path.dirname(os.path.abspath(__file__))
+    for module in IMPORT_MODULES:
+        code = (f"import sys, time; t = time.perf_counter(); import {module}; d = time.perf_counter() - t; "
+                f"print(d * 1000); print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+        times, heavy, error = [], "", None
+        for _ in range(repeat):
+            proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=here, timeout=120)
+            out = proc.stdout.split("\n")
+            if proc.returncode != 0:
+                error = proc.stderr.strip().splitlines()[-1:] or ["import failed"]
+                break
+            times.append(float(out[0]))
+            heavy = out[1]
+        if error:
+            rows.append({'section': 'import', 'name': module, 'error': error[0]})
+            print(f"  import {module:10s} failed: {error[0]}", file=log)
+            continue
+        rows.append({'section': 'import', 'name': module, 'min_ms': round(min(times), 3),
+                     'median_ms': round(statistics.median(times), 3), 'heavy': [m for m in heavy.split(",") if m]})
+        print(f"  import {module:10s} {min(times):9.2f} ms  heavy={heavy or '-'}", file=log)
+    return rows
+
+def check_import_budget(rows, budget_ms, log):
+    # 엔진 단독 import: 시간 예산 + 무거운 모듈 금지
+    failures = []
+    for row in rows:
+        if row['section'] != 'import' or row['name'] not in LIGHT_MODULES: continue
+        if 'error' in row:
+            failures.append(f"{row['name']}: {row['error']}")
+            continue
+        if row['min_ms'] > budget_ms:
+            failures.append(f"{row['name']}: import {row['min_ms']:.0f} ms > budget {budget_ms:.0f} ms")
+        if row['heavy']:
+            failures.append(f"{row['name']}: pulls in {', '.join(row['heavy'])}")
+    for msg in failures: print(f"  BUDGET {msg}", file=log)
+    return failures
+
+# ==========================================
+# 3. 기준선 비교
+# ==========================================
+def row_key(row):
+    return (row['section'], row['name'], row.get('engine') or row.get('kind') or "")
+
+def compare(current, baseline, max_slowdown, min_delta_ms, max_mem_growth, log, metric='min_ms'):
+    base = {row_key(r): r for r in baseline['results'] if metric in r}
+    regressions = []
+    for row in current['results']:
+        old = base.get(row_key(row))
+        if old is None or metric not in row: continue
+        ratio = row[metric] / old[metric] if old[metric] > 0 else 1.0
+        slow = ratio > max_slowdown and row[metric] - old[metric] > min_delta_ms
+        mem_ratio = row['peak_kb'] / old['peak_kb'] if old.get('peak_kb') else 1.0
+        fat = max_mem_growth is not None and mem_ratio > max_mem_growth
+        changed = 'result_hash' in row and old.get('result_hash') not in (None, row['result_hash'])
+        if slow or fat or changed:
+            label = "/".join(k for k in row_key(row) if k)
+            print(f"  {'SLOW' if slow else 'MEM ' if fat else 'DIFF'} {label:60s} "
+                  f"{old[metric]:9.2f} -> {row[metric]:9.2f} ms (x{ratio:.2f}), "
+                  f"peak x{mem_ratio:.2f}{', results changed' if changed else ''}", file=log)
+        if slow or fat: regressions.append(row_key(row))
+    return regressions
+
+# ==========================================
+# 4. 실행
+# ==========================================
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run(args, log=sys.stderr):
+    matrix = build_matrix(args.matrix)
+    engines = list(ENGINES) if args.engine == 'both' else [args.engine]
+    print(f"{len(matrix)} scenarios x {len(engines)} engines, repeat={args.repeat}", file=log)
+
+    results = bench_imports(args.repeat, log)
+    search_rows, tops = bench_search(matrix, engines, args.repeat, log)
+    results += search_rows
+    if not args.no_figures:
+        results += bench_figures(tops, args.repeat, not args.no_pdf, log)
+
+    return {'meta': {'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"), 'commit': git_commit(),
+                     'python': platform.python_version(), 'numpy': np.__version__,
+                     'platform': platform.platform(), 'cpus': os.cpu_count(),
+                     'matrix': args.matrix, 'repeat': args.repeat},
+            'results': results}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the search engine, figure builders and PDF export")
+    ap.add_argument("--matrix", choices=("quick", "full"), default="quick", help="scenario set")
+    ap.add_argument("--engine", choices=("py", "np", "both"), default="both", help="search engine(s) to time")
+    ap.add_argument("--repeat", type=int, default=5, help="timed runs per item")
+    ap.add_argument("--out", default="bench_results.json", help="machine-readable results file")
+    ap.add_argument("--no-figures", action="store_true", help="skip figure builders and PDF")
+    ap.add_argument("--no-pdf", action="store_true", help="skip create_pdf_report")
+    ap.add_argument("--import-budget-ms", type=float, default=300.0, help="fail if importing engine/batch takes longer")
+    ap.add_argument("--compare", default=None, help="baseline results file to compare against")
+    ap.add_argument("--metric", choices=("min_ms", "median_ms"), default="min_ms", help="time compared against the baseline")
+    ap.add_argument("--max-slowdown", type=float, default=1.25, help="fail if the time grows beyond this ratio")
+    ap.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore slowdowns smaller than this (noise floor)")
+    ap.add_argument("--max-mem-growth", type=float, default=None, help="fail if peak memory grows beyond this ratio")
+    args = ap.parse_args(argv)
+
+    current = run(args)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(current, f, ensure_ascii=False, indent=1)
+    print(f"wrote {args.out}", file=sys.stderr)
+
+    status = 0
+    if check_import_budget(current['results'], args.import_budget_ms, sys.stderr): status = 1
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"compare against {args.compare} (commit {baseline['meta'].get('commit')})", file=sys.stderr)
+        regressions = compare(current, baseline, args.max_slowdown, args.min_delta_ms, args.max_mem_growth, sys.stderr, args.metric)
+        if regressions:
+            print(f"{len(regressions)} regression(s)", file=sys.stderr)
+            status = 1
+        else:
+            print("no regressions", file=sys.stderr)
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
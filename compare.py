@@ -0,0 +1,132 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import BOX_MARGINS, PALLET_CATALOG, PalletLogic, parse_dimensions, pareto_objectives
+
+# 같은 제품을 여러 파레트에 동시에 (파레트 1개 = 워커 작업 1개)
+# python compare.py 180,120,50 --weight 300
+# python compare.py 180,120,50 --pallet "KR 1100x1100" --pallet 1140,1140,1500
+#
+# 제품 방향/입수(c x r) 칸 계산(PackCells)은 워커마다 가장 큰 바닥 기준으로 한 번만 만들어 두고
+# 같은 제품의 다음 파레트부터는 자기 파레트 크기만큼 잘라서 패턴/필터/순위만 계산
+# (작업에는 파라미터만 보냄, PackCells 는 수 MB 라 작업마다 pickle 하면 그게 더 느림)
+
+# ==========================================
+# 1. 워커
+# ==========================================
+_worker_sim = None
+_worker_packs = None  # (key, PackCells): 워커당 최근 제품 1개
+
+def _init_worker():
+    global _worker_sim
+    _worker_sim = PalletLogic()
+
+def worker_packs(sim, params, max_L, max_W):
+    global _worker_packs
+    p_dims, box_margin, allow_rotation = params[0], params[4], params[8]
+    key = (tuple(p_dims), box_margin, bool(allow_rotation), max_L, max_W)
+    if _worker_packs is not None and _worker_packs[0] == key: return _worker_packs[1], 0.0
+    t0 = time.perf_counter()
+    packs = sim.build_packs(p_dims, box_margin, allow_rotation, max_L, max_W)
+    _worker_packs = (key, packs)
+    return packs, round((time.perf_counter() - t0) * 1000, 1)
+
+def run_pallet(params, max_floor, top_n):
+    sim = _worker_sim or PalletLogic()
+    packs, packs_ms = worker_packs(sim, params, *max_floor)
+    t0 = time.perf_counter()
+    candidates = sim.find_candidates_np(*params, packs=packs)
+    return {'n': len(candidates), 'candidates': candidates[:top_n] if top_n else candidates,
+            'ms': round((time.perf_counter() - t0) * 1000, 1), 'packs_ms': packs_ms, 'search': sim.search_stats}
+
+def new_pool(workers=None):
+    workers = min(workers or os.cpu_count() or 1, len(PALLET_CATALOG))
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+# ==========================================
+# 2. 비교
+# ==========================================
+def catalog_pallets(names=None):
+    names = names or list(PALLET_CATALOG)
+    return [(name, PALLET_CATALOG[name]) for name in names]
+
+def compare_pallets(params, pallets, top_n=3, pool=None, workers=None):
+    # params: find_candidates 인자 (pallet_dims 자리는 무시), pallets: [(이름, (L, W, H)), ...]
+    t_start = time.perf_counter()
+    max_floor = (max(p[1][0] for p in pallets), max(p[1][1] for p in pallets))
+    jobs = [tuple(params[:7]) + (tuple(dims),) + tuple(params[8:]) for _, dims in pallets]
+
+    if pool is None and len(jobs) > 1 and (workers or os.cpu_count() or 1) > 1:
+        with new_pool(workers) as own_pool:
+            outs = [f.result() for f in [own_pool.submit(run_pallet, job, max_floor, top_n) for job in jobs]]
+    elif pool is not None:
+        outs = [f.result() for f in [pool.submit(run_pallet, job, max_floor, top_n) for job in jobs]]
+    else:
+        outs = [run_pallet(job, max_floor, top_n) for job in jobs]
+
+    results = [dict(out, name=name, pallet=tuple(dims)) for (name, dims), out in zip(pallets, outs)]
+    # packs_ms: 워커들이 PackCells 만드는 데 쓴 시간 합 (워커당 제품별 1회)
+    return {'pallets': results, 'packs_ms': round(sum(out['packs_ms'] for out in outs), 1),
+            'ms': round((time.perf_counter() - t_start) * 1000, 1)}
+
+def summary_rows(compared):
+    # 파레트별 1위 요약 (없으면 None)
+    rows = []
+    for res in compared['pallets']:
+        best = res['candidates'][0] if res['candidates'] else None
+        rows.append({
+            'name': res['name'], 'pallet': res['pallet'], 'n': res['n'],
+            'pattern': best and best.interlock_desc_key, 'pattern_type': best and best.pattern_type,
+            'qty': best and best.qty, 'boxes': best and best.total_boxes, 'total': best and best.total,
+            'efficiency': best and round(best.efficiency, 1), 'sf': best and round(best.strength.sf, 2),
+            'unsafe': best and best.strength.unsafe, 'ms': res['ms'],
+        })
+    return rows
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compare the best options for one product across pallets")
+    ap.add_argument("dims", help="product dims as L,W,H (mm)")
+    ap.add_argument("--weight", type=float, default=5.0, help="product weight (g)")
+    ap.add_argument("--box-type", type=int, default=0, choices=range(len(BOX_MARGINS)))
+    ap.add_argument("--min-qty", type=int, default=10)
+    ap.add_argument("--max-qty", type=int, default=100)
+    ap.add_argument("--max-box-weight", type=int, default=10000, help="(g)")
+    ap.add_argument("--stack-limit", type=int, default=6)
+    ap.add_argument("--min-layer-qty", type=int, default=4)
+    ap.add_argument("--max-layer-qty", type=int, default=0)
+    ap.add_argument("--no-rotation", action="store_true")
+    ap.add_argument("--block-layers", action="store_true")
+    ap.add_argument("--pareto", default="", help="e.g. total,sf,efficiency")
+    ap.add_argument("--pallet", action="append", default=[], help="catalog name or L,W,H (repeatable, default: whole catalog)")
+    ap.add_argument("--top", type=int, default=3)
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    p_dims = parse_dimensions(args.dims)
+    if not p_dims:
+        print(f"invalid dims: {args.dims!r}", file=sys.stderr)
+        return 2
+    pallets = []
+    for p in args.pallet or list(PALLET_CATALOG):
+        dims = PALLET_CATALOG.get(p) or parse_dimensions(p)
+        if not dims or len(dims) < 3:
+            print(f"invalid pallet: {p!r}", file=sys.stderr)
+            return 2
+        pallets.append((p, tuple(dims[:3])))
+
+    params = (p_dims, args.weight, args.max_box_weight, args.box_type, BOX_MARGINS[args.box_type], args.min_qty, args.max_qty,
+              None, not args.no_rotation, args.stack_limit, args.min_layer_qty, args.max_layer_qty,
+              args.block_layers, pareto_objectives(args.pareto))
+    compared = compare_pallets(params, pallets, args.top, workers=args.workers)
+    for res in compared['pallets']:
+        print(json.dumps({'name': res['name'], 'pallet': res['pallet'], 'n': res['n'], 'ms': res['ms'],
+                          'candidates': [c.to_dict() for c in res['candidates']]}, ensure_ascii=False))
+    print(f"{len(pallets)} pallets in {compared['ms']:.0f} ms (packs {compared['packs_ms']:.0f} ms)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
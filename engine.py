@@ -0,0 +1,1578 @@
+import math
+import bisect
+import re
+import itertools
+import os
+import tempfile
+import pickle
+import hashlib
+import heapq
+import threading
+import time
+import json
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+import yield_table
+
+# 박스 종류(A/B/AB골)별 내외측 치수 차이 (mm)
+BOX_MARGINS = [10, 14, 24]
+
+# 표준 파레트 (L, W, 적재 높이 mm), 비교 모드 기본 목록
+PALLET_CATALOG = OrderedDict([
+    ("KR 1100x1100", (1100, 1100, 1650)),
+    ("EUR 1200x800", (1200, 800, 1650)),
+    ("EU 1200x1000", (1200, 1000, 1650)),
+    ("US 48x40in", (1219, 1016, 1650)),
+])
+
+# ==========================================
+# 1. 유틸리티 함수
+# ==========================================
+def parse_dimensions(dim_str):
+    try:
+        cleaned = re.sub(r'[^\d.]+', ',', str(dim_str))
+        parts = [float(x) for x in cleaned.split(',') if x.strip()]
+        if len(parts) == 3:
+            return [int(p) for p in parts]
+        return None
+    except:
+        return None
+
+def fmt(num):
+    if num is None: return ""
+    try:
+        val = float(num)
+        if val.is_integer():
+            return "{:,}".format(int(val))
+        return "{:,.2f}".format(val).rstrip('0').rstrip('.')
+    except:
+        return str(num)
+
+# ------------------------------------------
+# 계측 (단계별 시간 + 탐색 카운터)
+# ------------------------------------------
+# rej_* 는 (c, r) 칸이 처음 걸린 필터, rej_layer_qty 는 패턴 단위
+# sym_* 는 대칭이라 아예 계산하지 않은 중복: 같은 (d1, d2, p_H) 조합 / 이미 본 칸의 90도 회전 칸 /
+#   정사각 바닥 박스의 두 번째 파레트 방향 (전부 seen_configs 에서 버려졌을 후보)
+SEARCH_COUNTERS = ('orientations', 'cells', 'rej_fit', 'rej_aspect', 'rej_weight', 'rej_max_qty', 'rej_stack',
+                   'rej_min_qty', 'rej_height', 'branches', 'pruned', 'rej_layer_qty', 'configs',
+                   'dedup_hits', 'pushed', 'emitted', 'block_solved', 'block_capped', 'block_skipped',
+                   'sym_orientations', 'sym_cells', 'sym_square')
+RUN_LOG = logging.getLogger("pallet.run")
+
+def new_search_stats(engine):
+    stats = dict.fromkeys(SEARCH_COUNTERS, 0)
+    stats['engine'] = engine
+    stats['ms'] = {}
+    return stats
+
+def add_ms(stats, stage, seconds):
+    stats['ms'][stage] = round(stats['ms'].get(stage, 0.0) + seconds * 1000, 3)
+
+@contextmanager
+def timed(stats, stage):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_ms(stats, stage, time.perf_counter() - t0)
+
+def log_run(event, **fields):
+    # 실행 1회 = JSON 한 줄 (PALLET_RUN_LOG 지정 시 파일, 아니면 stderr)
+    if not RUN_LOG.handlers:
+        path = os.environ.get("PALLET_RUN_LOG")
+        handler = logging.FileHandler(path, encoding="utf-8") if path else logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        RUN_LOG.addHandler(handler)
+        RUN_LOG.setLevel(logging.INFO)
+        RUN_LOG.propagate = False
+    RUN_LOG.info(json.dumps(dict({'event': event, 'ts': round(time.time(), 3)}, **fields), ensure_ascii=False, default=str))
+
+# ==========================================
+# 2. 계산 로직
+# ==========================================
+class _Record:
+    # dict처럼 res['qty'], res.get('pinwheel_k', 0) 으로 읽을 수 있는 슬롯 레코드
+    __slots__ = ()
+    KEYS = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def keys(self):
+        return self.KEYS
+
+    def to_dict(self):
+        out = {}
+        for k in self.KEYS:
+            v = getattr(self, k)
+            out[k] = v.to_dict() if isinstance(v, _Record) else v
+        return out
+
+    def fingerprint(self):
+        # 세션/프로세스와 무관하게 같은 후보면 같은 값 (그림 캐시 키)
+        return hashlib.sha1(repr(self.to_dict()).encode()).hexdigest()
+
+    def __eq__(self, other):
+        if not isinstance(other, _Record): return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, k) for k in self.__slots__)
+
+    def __setstate__(self, state):
+        for k, v in zip(self.__slots__, state): setattr(self, k, v)
+
+class Strength(_Record):
+    __slots__ = ('bct', 'load', 'sf', 'unsafe')
+    KEYS = __slots__
+
+    def __init__(self, bct, load, sf, unsafe):
+        self.bct = bct
+        self.load = load
+        self.sf = sf
+        self.unsafe = unsafe
+
+class Candidate(_Record):
+    # box_inner / total_boxes / load_dims / pack_layout / pallet_layout 은 저장하지 않고 계산
+    __slots__ = ('qty', 'pattern_type', 'pattern_dims', 'box_outer', 'prod_detail', 'prod_dims_used',
+                 'yield_per_layer', 'total', 'interlock_desc_key', 'weight', 'score', 'p_layers',
+                 'efficiency', 'pinwheel_k', 'pallet_dims', 'strength', 'opt_orient', 'placements')
+    KEYS = ('qty', 'pattern_type', 'pattern_dims', 'box_outer', 'box_inner', 'prod_detail', 'prod_dims_used',
+            'yield_per_layer', 'total', 'total_boxes', 'interlock_desc_key', 'weight', 'score', 'p_layers',
+            'efficiency', 'pinwheel_k', 'load_dims', 'pallet_dims', 'strength', 'pack_layout', 'pallet_layout',
+            'opt_orient', 'placements')
+
+    def __init__(self, qty, pattern_type, pattern_dims, box_outer, prod_detail, prod_dims_used, yield_per_layer,
+                 total, interlock_desc_key, weight, score, p_layers, efficiency, pinwheel_k, pallet_dims, strength, opt_orient,
+                 placements=()):
+        self.qty = qty
+        self.pattern_type = pattern_type
+        self.pattern_dims = pattern_dims
+        self.box_outer = box_outer
+        self.prod_detail = prod_detail
+        self.prod_dims_used = prod_dims_used
+        self.yield_per_layer = yield_per_layer
+        self.total = total
+        self.interlock_desc_key = interlock_desc_key
+        self.weight = weight
+        self.score = score
+        self.p_layers = p_layers
+        self.efficiency = efficiency
+        self.pinwheel_k = pinwheel_k
+        self.pallet_dims = pallet_dims
+        self.strength = strength
+        self.opt_orient = opt_orient
+        self.placements = placements  # block 패턴만: 한 층의 (x, y, dx, dy)
+
+    @property
+    def box_inner(self):
+        d1, d2, p_H, c, r, layers = self.prod_detail
+        return (c * d1, r * d2, layers * p_H)
+
+    @property
+    def total_boxes(self):
+        return self.yield_per_layer * self.p_layers
+
+    @property
+    def load_dims(self):
+        L_box, W_box = self.opt_orient
+        height = self.p_layers * self.box_outer[2]
+        if self.pattern_type == 'pinwheel':
+            block_size = L_box + (self.pinwheel_k * W_box)
+            return (block_size, block_size, height)
+        if self.pattern_type == 'block':
+            return (max(x + dx for x, y, dx, dy in self.placements), max(y + dy for x, y, dx, dy in self.placements), height)
+        nx, ny = self.pattern_dims
+        return (nx * L_box, ny * W_box, height)
+
+    @property
+    def pack_layout(self):
+        return self.prod_detail[3:6]
+
+    @property
+    def pallet_layout(self):
+        return (self.pattern_dims[0], self.pattern_dims[1], self.p_layers)
+
+# 병렬 샤드 모드에서 후보 순번 = 칸 번호 * SEQ_STRIDE + 칸 안 순서 (칸 1개 후보 <= 격자 2 + 핀휠 12 + 블록)
+SEQ_STRIDE = 64
+
+class TopK:
+    # score 상위 k개만 유지, 동점이면 먼저 들어온 후보 우선 (기존 안정 정렬과 동일)
+    def __init__(self, k):
+        self.k = max(1, int(k))
+        self._heap = []
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def full(self):
+        return len(self._heap) >= self.k
+
+    def threshold(self):
+        return self._heap[0][0] if self.full() else None
+
+    def accepts(self, score):
+        return not self.full() or score > self._heap[0][0]
+
+    def push(self, cand):
+        self._seq += 1
+        entry = (cand['score'], -self._seq, cand)
+        if not self.full(): heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]: heapq.heapreplace(self._heap, entry)
+
+    def items(self):
+        return [e[2] for e in sorted(self._heap, key=lambda e: (-e[0], -e[1]))]
+
+# ------------------------------------------
+# 파레토 모드: 점수 상위 K 대신 비지배 후보 전체
+# ------------------------------------------
+PARETO_OBJECTIVES = {'total': 1, 'sf': 1, 'efficiency': 1, 'boxes': -1}  # 1 최대화, -1 최소화
+PARETO_DEFAULT = ('total', 'sf', 'efficiency')
+
+def pareto_objectives(value):
+    # None/False/"" -> () (점수 순위), True/"1" -> 기본 3개, "total,sf,boxes" -> 그대로
+    if value is None or value is False or value == 0: return ()
+    if value is True or value == 1: return PARETO_DEFAULT  # JSON 의 0 / 1
+    if isinstance(value, str):
+        v = value.strip().lower()
+        if v in ("", "0", "false", "n", "no"): return ()
+        if v in ("1", "true", "y", "yes", "o"): return PARETO_DEFAULT
+        value = [name.strip() for name in v.split(",") if name.strip()]
+    objectives = tuple(value)
+    for name in objectives:
+        if name not in PARETO_OBJECTIVES: raise ValueError(f"unknown pareto objective: {name!r}")
+    if len(set(objectives)) != len(objectives): raise ValueError("duplicate pareto objective")
+    return objectives
+
+def pareto_vector(cand, objectives):
+    vals = {'total': cand.total, 'sf': cand.strength.sf, 'efficiency': cand.efficiency, 'boxes': cand.total_boxes}
+    return tuple(PARETO_OBJECTIVES[k] * vals[k] for k in objectives)
+
+class ParetoArchive:
+    # TopK 와 같은 인터페이스 (가지치기 없음), 모든 목적값이 같거나 나쁜 후보는 버림 (같으면 먼저 들어온 후보 유지)
+    # 첫 목적값 내림차순으로 유지: 새 후보를 지배할 수 있는 건 앞쪽, 지배당할 수 있는 건 뒤쪽만 확인
+    def __init__(self, objectives):
+        self.objectives = tuple(objectives)
+        self._keys = []     # -첫 목적값 (오름차순)
+        self._entries = []  # (vec, seq, cand)
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def full(self):
+        return False
+
+    def threshold(self):
+        return None
+
+    def accepts(self, score):
+        return True
+
+    def push(self, cand):
+        self._seq += 1
+        vec = pareto_vector(cand, self.objectives)
+        key = -vec[0]
+        hi = bisect.bisect_right(self._keys, key)
+        for other in self._entries[:hi]:
+            if all(a >= b for a, b in zip(other[0], vec)): return
+        lo = bisect.bisect_left(self._keys, key)
+        tail = [e for e in self._entries[lo:] if not all(a <= b for a, b in zip(e[0], vec))]
+        self._entries[lo:] = tail
+        self._keys[lo:] = [-e[0][0] for e in tail]
+        pos = bisect.bisect_right(self._keys, key)
+        self._entries.insert(pos, (vec, self._seq, cand))
+        self._keys.insert(pos, key)
+
+    def items(self):
+        # 목적값 순서대로 사전식 내림차순, 동률은 들어온 순서
+        return [e[2] for e in sorted(self._entries, key=lambda e: (tuple(-v for v in e[0]), e[1]))]
+
+# ------------------------------------------
+# 병렬 단일 질의: 샤드별 (순번, 후보) -> 직렬 find_candidates 와 같은 결과
+# ------------------------------------------
+# 샤드마다 칸 필터(벡터 연산)까지는 전체를 보고, 통과한 칸 중 박스 치수 해시가 자기 것인 칸만
+# 패턴 행 / 중복 제거 / 순위 / 블록 배치 / 후보 생성 (find_candidates_np shard 모드)
+# 칸 단위 필터 카운터는 모든 샤드에서 같은 값
+SHARED_COUNTERS = ('orientations', 'cells', 'rej_fit', 'rej_aspect', 'rej_weight', 'rej_max_qty', 'rej_stack',
+                   'rej_min_qty', 'rej_height', 'branches', 'sym_orientations', 'sym_cells', 'sym_square')
+
+def merge_shards(parts, top_k=12, pareto=()):
+    # 중복 제거 키(box_sorted 포함)가 같은 후보는 한 샤드에만 있으므로 순번 순서로 다시 넣으면 직렬과 같음
+    pareto = pareto_objectives(pareto)
+    candidates = ParetoArchive(pareto) if pareto else TopK(top_k)
+    for _, cand in sorted((e for part in parts for e in part), key=lambda e: e[0]):
+        candidates.push(cand)
+    return candidates.items()
+
+def merge_shard_stats(stats_list, concurrent=True):
+    # concurrent=False: 한 프로세스에서 차례로 돈 샤드 (iter_candidates_np) -> 단계별 시간은 합
+    stats = new_search_stats('np-sharded')
+    stats['shards'] = len(stats_list)
+    stats['shard_cells'] = [part.get('shard_cells', 0) for part in stats_list]
+    for part in stats_list:
+        for key in SEARCH_COUNTERS:
+            if key in SHARED_COUNTERS: stats[key] = part[key]
+            else: stats[key] += part[key]
+        for stage, ms in part['ms'].items():
+            # 동시에 돌면 가장 느린 샤드
+            stats['ms'][stage] = max(stats['ms'].get(stage, 0.0), ms) if concurrent else round(stats['ms'].get(stage, 0.0) + ms, 3)
+    return stats
+
+# ------------------------------------------
+# 허용오차 스윕: 치수 ±mm x 무게 ±% 격자에서 추천이 유지되는지
+# ------------------------------------------
+def sweep_steps(tol, n_side):
+    # 0 을 가운데로 -tol..+tol 을 2*n_side+1 개로 (tol <= 0 이면 [0])
+    if tol <= 0 or n_side < 1: return [0]
+    return [round(tol * i / n_side, 6) for i in range(-n_side, n_side + 1)]
+
+def layout_key(cand):
+    # 치수가 조금 달라도 같은 입수/방향/패턴이면 같은 추천 (제품 방향은 치수 크기 순위로)
+    d1, d2, p_H, c, r, layers = cand.prod_detail
+    ranks = sorted(cand.prod_dims_used)
+    return (tuple(ranks.index(v) for v in (d1, d2, p_H)), c, r, layers,
+            cand.pattern_type, cand.interlock_desc_key, cand.pinwheel_k, tuple(cand.pattern_dims))
+
+class PreCandidates:
+    # 필터와 무관한 (c, r) 칸 + 패턴 행 (제품 치수/회전/파레트 바닥/여유치수 기준)
+    # c*r > cr_cap 인 칸은 무게/최대 수량 필터에 반드시 걸리므로 c*r 분포(excl_cr, excl_cum)만 보관
+    __slots__ = ('key', 'cr_cap', 'margin', 'blocks', 'cells', 'rows', 'counts', 'excl_cr', 'excl_cum')
+
+    def __init__(self, key, cr_cap, margin, blocks, cells, rows, counts, excl_cr, excl_cum):
+        self.key = key
+        self.cr_cap = cr_cap
+        self.margin = margin
+        self.blocks = blocks
+        self.cells = cells
+        self.rows = rows
+        self.counts = counts
+        self.excl_cr = excl_cr
+        self.excl_cum = excl_cum
+
+    def covers(self, key, cr_cap):
+        return self.key == key and cr_cap <= self.cr_cap
+
+    @property
+    def nbytes(self):
+        arrays = list(self.cells.values()) + list(self.rows.values()) + [self.excl_cr, self.excl_cum]
+        return sum(a.nbytes for a in arrays)
+
+class PackCells:
+    # 파레트와 무관한 제품 쪽 계산: 제품 방향 x 박스 방향마다 c x r 칸의 박스 외형/종횡비/안정 단수
+    # 가장 큰 바닥(max_L x max_W) 기준으로 한 번 만들고 파레트마다 [:pl_L // d1, :pl_W // d2] 로 잘라 씀
+    __slots__ = ('key', 'max_L', 'max_W', 'grids')
+
+    def __init__(self, key, max_L, max_W, grids):
+        self.key = key
+        self.max_L = max_L
+        self.max_W = max_W
+        self.grids = grids
+
+    def covers(self, key, pl_L, pl_W):
+        return self.key == key and pl_L <= self.max_L and pl_W <= self.max_W
+
+# ------------------------------------------
+# 블록 배치: 한 층에 L×W 박스를 최대로 (guillotine 재귀 분할 + 5-block)
+# ------------------------------------------
+BLOCK_TIME_CAP = 0.2        # 박스 1종당 (초)
+BLOCK_SEARCH_BUDGET = 3.0   # 검색 1회당 (초), 넘으면 새 박스는 풀지 않음
+BLOCK_MAX_BOXES = 80        # 층당 면적 상한이 이보다 크면 격자와 차이가 작아 생략
+
+def _raster_points(size, l, w):
+    # a*l + b*w <= size 인 길이 (절단 위치 후보), 오름차순
+    pts = set()
+    for a in range(int(size // l) + 1):
+        base = a * l
+        for b in range(int((size - base) // w) + 1):
+            pts.add(base + b * w)
+    return sorted(pts)
+
+class _BlockSolver:
+    # plan: ('h', 0|1) 단일 방향 격자 / ('x', cut) / ('y', cut) / ('5', x1, x2, y1, y2)
+    def __init__(self, L, W, l, w, deadline):
+        self.l, self.w = l, w
+        self.xs = _raster_points(L, l, w)
+        self.ys = _raster_points(W, l, w)
+        self.deadline = deadline
+        self.capped = False
+        self.memo = {}
+
+    def _floor(self, pts, v):
+        return pts[bisect.bisect_right(pts, v) - 1]
+
+    def _multiples(self, size):
+        return sorted({m * d for d in (self.l, self.w) for m in range(1, int(size // d) + 1) if m * d < size})
+
+    def _bound(self, X, Y):
+        return int((X * Y) // (self.l * self.w))
+
+    def best(self, X, Y):
+        key = (X, Y)
+        hit = self.memo.get(key)
+        if hit is not None: return hit
+        l, w = self.l, self.w
+        n0 = int(X // l) * int(Y // w)
+        n1 = int(X // w) * int(Y // l)
+        res = (n0, ('h', 0)) if n0 >= n1 else (n1, ('h', 1))
+        bound = self._bound(X, Y)
+        if res[0] < bound:
+            if time.perf_counter() > self.deadline:
+                self.capped = True
+            else:
+                for axis, pts, size in (('x', self.xs, X), ('y', self.ys, Y)):
+                    for cut in pts:
+                        if cut <= 0: continue
+                        if cut > size / 2: break
+                        rest = self._floor(pts, size - cut)
+                        if axis == 'x':
+                            if self._bound(cut, Y) + self._bound(rest, Y) <= res[0]: continue
+                            n = self.best(cut, Y)[0] + self.best(rest, Y)[0]
+                        else:
+                            if self._bound(X, cut) + self._bound(X, rest) <= res[0]: continue
+                            n = self.best(X, cut)[0] + self.best(X, rest)[0]
+                        if n > res[0]:
+                            res = (n, (axis, cut))
+                            if n >= bound: break
+                    if res[0] >= bound: break
+        self.memo[key] = res
+        return res
+
+    def five_block(self, X, Y, best_n):
+        # 가운데 블록을 4개 블록이 바람개비처럼 감싸는 1차 비-guillotine 분할
+        # 분할 위치는 l 또는 w 의 정수배만 (전체 raster 는 n^4 이라 너무 느림)
+        res = None
+        xs = self._multiples(X)
+        ys = self._multiples(Y)
+        bound = self._bound(X, Y)
+        # 나머지 변의 raster 내림값은 미리 계산, 5개 면적 합으로 먼저 걸러냄 (sum(floor) <= floor(sum))
+        rest_x = {x: self._floor(self.xs, X - x) for x in xs}
+        rest_y = {y: self._floor(self.ys, Y - y) for y in ys}
+        unit = self.l * self.w
+        best = self.best
+        for i, x1 in enumerate(xs):
+            rx1 = rest_x[x1]
+            for x2 in xs[i + 1:]:
+                if time.perf_counter() > self.deadline:
+                    self.capped = True
+                    return res
+                rx2, cx = rest_x[x2], x2 - x1
+                for j, y1 in enumerate(ys):
+                    ry1 = rest_y[y1]
+                    for y2 in ys[j + 1:]:
+                        ry2 = rest_y[y2]
+                        if (x2 * y1 + rx2 * y2 + rx1 * ry2 + x1 * ry1 + cx * (y2 - y1)) // unit <= best_n: continue
+                        n = (best(x2, y1)[0] + best(rx2, y2)[0] + best(rx1, ry2)[0] + best(x1, ry1)[0]
+                             + best(cx, y2 - y1)[0])
+                        if n > best_n:
+                            best_n, res = n, (n, ('5', x1, x2, y1, y2))
+                            if n >= bound: return res
+        return res
+
+    def place(self, X, Y, plan, ox, oy, out):
+        l, w = self.l, self.w
+        kind = plan[0]
+        if kind == 'h':
+            bl, bw = (l, w) if plan[1] == 0 else (w, l)
+            for i in range(int(X // bl)):
+                for j in range(int(Y // bw)): out.append((ox + i * bl, oy + j * bw, bl, bw))
+        elif kind == 'x':
+            cut = plan[1]
+            rest = self._floor(self.xs, X - cut)
+            self.place(cut, Y, self.best(cut, Y)[1], ox, oy, out)
+            self.place(rest, Y, self.best(rest, Y)[1], ox + cut, oy, out)
+        elif kind == 'y':
+            cut = plan[1]
+            rest = self._floor(self.ys, Y - cut)
+            self.place(X, cut, self.best(X, cut)[1], ox, oy, out)
+            self.place(X, rest, self.best(X, rest)[1], ox, oy + cut, out)
+        else:
+            _, x1, x2, y1, y2 = plan
+            fx, fy = self._floor(self.xs, X - x2), self._floor(self.ys, Y - y2)
+            for rx, ry, px, py in ((x2, y1, 0, 0), (fx, y2, x2, 0), (self._floor(self.xs, X - x1), fy, x1, y2),
+                                   (x1, self._floor(self.ys, Y - y1), 0, y1), (x2 - x1, y2 - y1, x1, y1)):
+                self.place(rx, ry, self.best(rx, ry)[1], ox + px, oy + py, out)
+
+def simple_layer_max(pl_L, pl_W, l, w):
+    # 격자(2방향) / 핀휠 중 최대 층당 개수 (_solve_grid, _solve_pinwheel 과 같은 규칙)
+    best = max(int(pl_L // l) * int(pl_W // w), int(pl_L // w) * int(pl_W // l))
+    short_pl = min(pl_L, pl_W)
+    for a, b in ((l, w), (w, l)):
+        k_cap = int(a // b) + 3
+        k = min(k_cap, int((short_pl - a) // b)) if short_pl >= a else 0
+        if k >= 1: best = max(best, 4 * k)
+    return best
+
+def solve_block_layer(pl_L, pl_W, l, w, time_cap=BLOCK_TIME_CAP, simple=None):
+    # -> (n, placements((x, y, dx, dy), ...), capped) / 격자·핀휠보다 많이 못 넣으면 None
+    if l <= 0 or w <= 0: return None
+    if simple is None: simple = simple_layer_max(pl_L, pl_W, l, w)
+    if (pl_L * pl_W) // (l * w) <= simple: return None
+    solver = _BlockSolver(pl_L, pl_W, l, w, time.perf_counter() + time_cap)
+    X, Y = solver.xs[-1], solver.ys[-1]
+    bound = solver._bound(X, Y)
+    if bound <= simple or bound > BLOCK_MAX_BOXES: return None
+    n, plan = solver.best(X, Y)
+    if n < bound:
+        five = solver.five_block(X, Y, n)
+        if five: n, plan = five
+    if n <= simple: return None
+    out = []
+    solver.place(X, Y, plan, 0, 0, out)
+    return n, tuple(out), solver.capped
+
+# (pl_L, pl_W, 긴 변, 짧은 변) -> solve_block_layer 결과, 프로세스 전체 공유
+BLOCK_CACHE = OrderedDict()
+BLOCK_CACHE_MAX = 4096
+_BLOCK_LOCK = threading.Lock()
+
+class PalletLogic:
+    def __init__(self):
+        self.MATERIAL_PROPS = {
+            0: {"ect": 5.0, "thick": 5.0}, 
+            1: {"ect": 4.0, "thick": 3.0}, 
+            2: {"ect": 7.0, "thick": 8.0}  
+        }
+        self._pre = None  # 마지막 사전 후보 (find_candidates_np)
+        self._block_spent = 0.0  # 이번 검색에서 블록 배치 계산에 쓴 시간 (초)
+        self._yields = None  # 이번 검색의 파레트 층 적재 테이블 (yield_table)
+
+    def check_pinwheel_layers(self, box_l, box_w, pallet_l):
+        remaining_space = pallet_l - box_l
+        if remaining_space < box_w: return 0
+        return int(remaining_space // box_w)
+
+    def calculate_bct(self, length, width, fl_idx):
+        props = self.MATERIAL_PROPS.get(fl_idx)
+        if not props: return 0
+        ect = props['ect'] 
+        caliper = props['thick'] 
+        perimeter = (length + width) * 2 
+        bct_newton = 5.87 * ect * math.sqrt(caliper * perimeter)
+        bct_kgf = bct_newton / 9.80665 * 1000 
+        return bct_kgf 
+
+    def find_candidates(self, p_dims_input, p_weight_g, max_box_w_g, box_type_idx, box_margin, min_qty, max_qty, pallet_dims, allow_rotation, stack_limit, min_layer_qty, max_layer_qty, block_layers=False, pareto=(), top_k=12):
+        pareto = pareto_objectives(pareto)
+        candidates = ParetoArchive(pareto) if pareto else TopK(top_k)
+        for _ in self._search(candidates, p_dims_input, p_weight_g, max_box_w_g, box_type_idx, box_margin, min_qty, max_qty, pallet_dims, allow_rotation, stack_limit, min_layer_qty, max_layer_qty, block_layers): pass
+        return candidates.items()
+
+    def iter_candidates(self, p_dims_input, p_weight_g, max_box_w_g, box_type_idx, box_margin, min_qty, max_qty, pallet_dims, allow_rotation, stack_limit, min_layer_qty, max_layer_qty, block_layers=False, pareto=(), top_k=12, deadline=None, cancel=None, every=0.2):
+        # 탐색 도중 (진행률 0~1, 현재 상위 K, 상태) 를 every 초마다 (상위 K 가 바뀐 경우만), 마지막 1번은 항상
+        # deadline: time.monotonic() 기준 마감 시각, cancel: is_set() 이 있는 객체 (threading.Event 등)
+        # 상태: 'running' / 'done' / 'deadline' / 'cancelled', 'done' 의 목록은 find_candidates 와 같음
+        # 마감/취소는 c 한 줄 단위로 확인 (블록 배치는 칸당 BLOCK_TIME_CAP 까지 늦어질 수 있음)
+        pareto = pareto_objectives(pareto)
+        candidates = ParetoArchive(pareto) if pareto else TopK(top_k)
+        steps = self._search(candidates, p_dims_input, p_weight_g, max_box_w_g, box_type_idx, box_margin, min_qty, max_qty, pallet_dims, allow_rotation, stack_limit, min_layer_qty, max_layer_qty, block_layers)
+        state, progress, last = 'done', 0.0, None
+        t_next = time.monotonic() + every
+        for progress in steps:
+            now = time.monotonic()
+            if cancel is not None and cancel.is_set():
+                state = 'cancelled'
+                break
+            if deadline is not None and now >= deadline:
+                state = 'deadline'
+                break
+            if now >= t_next:
+                t_next = now + every
+                items = candidates.items()
+                if items != last:
+                    last = items
+                    yield progress, items, 'running'
+        steps.close()
+        if state == 'done': progress = 1.0
+        self.search_stats.update(stopped=state, progress=round(progress, 3))
+        yield progress, candidates.items(), state
+
+    def _search(self, candidates, p_dims_input, p_weight_g, max_box_w_g, box_type_idx, box_margin, min_qty, max_qty, pallet_dims, allow_rotation, stack_limit, min_layer_qty, max_layer_qty, block_layers=False):
+        # 제품 방향 x c x r 칸을 훑으며 candidates 에 넣음, c 한 줄마다 진행률 (본 칸 / 전체 칸) 을 yield
+        # 중간에 닫혀도 (close) 그때까지의 search_stats 는 남김
+        pl_L, pl_W, pl_H = pallet_dims
+        if max_box_w_g <= 0: max_box_w_g = 999999
+        if p_weight_g <= 0: p_weight_g = 1
+        limit_qty_by_weight = int(max_box_w_g / p_weight_g)
+        
+        t_start = time.perf_counter()
+        stats = new_search_stats('py')
+        self._block_spent = 0.0
+        with timed(stats, 'yield_table'):
+            table = self._yields = yield_table.get_table(pl_L, pl_W)
+        stats['yield_table'] = table is not None
+        seen_configs = set()
+        branches = pruned = cells = 0
+        rej_fit = rej_aspect = rej_weight = rej_max_qty = rej_stack = rej_min_qty = rej_height = 0
+        t_grid = t_pin = t_block = 0.0
+        
+        prod_orientations = self.product_orientations(p_dims_input, allow_rotation)
+        triples = self.canonical_triples(prod_orientations)
+        stats['orientations'] = len(prod_orientations)
+        stats['sym_orientations'] = 2 * len(prod_orientations) - len(triples)
+        sym_cells = 0
+        usable_pl_L = pl_L
+        usable_pl_W = pl_W
+
+        total = sum((usable_pl_L // d1) * (usable_pl_W // d2) for _, (d1, d2), _ in triples) or 1
+        seen = 0
+
+        try:
+            # 같은 (d1, d2, p_H) 는 처음 나온 제품 방향으로 한 번만, 90도 회전 칸 (r, c) 을 이미 봤으면 생략
+            for (p_L, p_W, p_H), (d1, d2), mirrored in triples:
+                max_c_prod = usable_pl_L // d1
+                max_r_prod = usable_pl_W // d2
+                mirror_c, mirror_r = (usable_pl_W // d1, usable_pl_L // d2) if mirrored else (0, 0)
+                
+                for c in range(1, int(max_c_prod) + 1):
+                    for r in range(1, int(max_r_prod) + 1):
+                        if c <= mirror_c and r <= mirror_r and (d1 != d2 or r < c):
+                            sym_cells += 1
+                            continue
+                        cells += 1
+                        req_in_l = c * d1
+                        req_in_w = r * d2
+                        out_l = req_in_l + box_margin
+                        out_w = req_in_w + box_margin
+                        
+                        if (out_l > usable_pl_L and out_l > usable_pl_W) or (out_w > usable_pl_L and out_w > usable_pl_W):
+                            rej_fit += 1
+                            continue
+                        
+                        long_side = max(out_l, out_w)
+                        short_side = min(out_l, out_w)
+                        if short_side > 0 and (long_side / short_side) > 3.5:
+                            rej_aspect += 1
+                            continue
+
+                        max_stable_height = long_side * 0.7 if long_side > 0 else 9999
+                        avail_prod_h = max_stable_height - box_margin
+                        geo_max_layers = max(1, int(avail_prod_h // p_H))
+                        
+                        weight_max_layers = limit_qty_by_weight // (c * r)
+                        user_max_layers = max_qty // (c * r)
+                        safe_layers = min(weight_max_layers, geo_max_layers, user_max_layers, stack_limit)
+                        
+                        if safe_layers < 1:
+                            if weight_max_layers < 1: rej_weight += 1
+                            elif user_max_layers < 1: rej_max_qty += 1
+                            else: rej_stack += 1
+                            continue
+                        qty = (c * r) * safe_layers
+                        if qty < min_qty:
+                            rej_min_qty += 1
+                            continue
+                        
+                        out_h = (safe_layers * p_H) + box_margin
+                        p_layers = int(pl_H // out_h)
+                        if p_layers < 1:
+                            rej_height += 1
+                            continue
+                        branches += 1
+                        if out_l == out_w: stats['sym_square'] += 1
+
+                        # 층당 최대 개수로도 K번째 점수를 못 넘으면 생략 (블록 배치가 없으면 테이블 값이 더 빡빡한 상한)
+                        # (unsafe 감점은 상한에 넣지 않음: 생략된 후보도 seen_configs를 선점했어야 하므로)
+                        if candidates.full():
+                            max_yield = (usable_pl_L * usable_pl_W) // (out_l * out_w)
+                            if not block_layers:
+                                hit = yield_table.lookup(table, out_l, out_w)
+                                if hit is not None: max_yield = int(hit['best'])
+                            if max_layer_qty > 0: max_yield = min(max_yield, max_layer_qty)
+                            if max_yield * p_layers * qty + 20 <= candidates.threshold():
+                                pruned += 1
+                                continue
+                        
+                        box_weight_kg = (qty * p_weight_g) / 1000.0
+                        bct_val = self.calculate_bct(out_l, out_w, box_type_idx)
+                        stack_load = box_weight_kg * (p_layers - 1)
+                        if stack_load <= 0: stack_load = 0.1
+                        sf = bct_val / stack_load
+                        is_unsafe = sf < 3.0
+                        
+                        pack_layout = (d1, d2, p_H, c, r, safe_layers)
+                        
+                        t0 = time.perf_counter()
+                        self._solve_grid(candidates, seen_configs, out_l, out_w, out_h, 
+                                         usable_pl_L, usable_pl_W, p_layers, qty, box_weight_kg,
+                                         bct_val, stack_load, sf, is_unsafe,
+                                         pack_layout, (p_L, p_W, p_H), pallet_dims,
+                                         min_layer_qty, max_layer_qty, stats)
+                        t1 = time.perf_counter()
+                        self._solve_pinwheel(candidates, seen_configs, out_l, out_w, out_h, 
+                                             usable_pl_L, usable_pl_W, p_layers, qty, box_weight_kg,
+                                             bct_val, stack_load, sf, is_unsafe,
+                                             pack_layout, (p_L, p_W, p_H), pallet_dims,
+                                             min_layer_qty, max_layer_qty, stats)
+                        t2 = time.perf_counter()
+                        if block_layers:
+                            self._solve_block(candidates, seen_configs, out_l, out_w, out_h,
+                                              usable_pl_L, usable_pl_W, p_layers, qty, box_weight_kg,
+                                              bct_val, stack_load, sf, is_unsafe,
+                                              pack_layout, (p_L, p_W, p_H), pallet_dims,
+                                              min_layer_qty, max_layer_qty, stats)
+                        t3 = time.perf_counter()
+                        t_grid += t1 - t0
+                        t_pin += t2 - t1
+                        t_block += t3 - t2
+                    seen += max_r_prod
+                    yield seen / total
+        finally:
+            stats.update(cells=cells, sym_cells=sym_cells, rej_fit=rej_fit, rej_aspect=rej_aspect, rej_weight=rej_weight,
+                         rej_max_qty=rej_max_qty, rej_stack=rej_stack, rej_min_qty=rej_min_qty,
+                         rej_height=rej_height, branches=branches, pruned=pruned, emitted=len(candidates))
+            add_ms(stats, 'solve_grid', t_grid)
+            add_ms(stats, 'solve_pinwheel', t_pin)
+            if block_layers: add_ms(stats, 'solve_block', t_block)
+            add_ms(stats, 'search', time.perf_counter() - t_start)
+            self.search_stats = stats
+
+    def _solve_grid(self, candidates, seen_configs, out_l, out_w, out_h, pl_L, pl_W, p_layers, qty, w_kg, bct, load, sf, unsafe, pack_layout, prod_dims, pallet_dims, min_lq, max_lq, stats):
+        orientations = [(out_l, out_w), (out_w, out_l)] if out_l != out_w else [(out_l, out_w)]
+        for (L_box, W_box) in orientations:
+            nx = int(pl_L // L_box)
+            ny = int(pl_W // W_box)
+            if nx * ny == 0: continue
+            
+            yield_per_layer = nx * ny
+            
+            if yield_per_layer < min_lq or (max_lq > 0 and yield_per_layer > max_lq):
+                stats['rej_layer_qty'] += 1
+                continue
+            stats['configs'] += 1
+
+            total = yield_per_layer * p_layers * qty
+            eff = (out_l * out_w * yield_per_layer) / (pl_L * pl_W) * 100
+            
+            desc = "pat_no_int"
+            if nx == ny and abs(L_box - W_box) < 10: desc = "pat_box_rot"
+            
+            score = total
+            if unsafe: score -= 500
+            
+            box_sorted = tuple(sorted([out_l, out_w, out_h]))
+            config_key = (qty, total, desc, int(eff), box_sorted)
+            
+            if config_key in seen_configs:
+                stats['dedup_hits'] += 1
+                continue
+            seen_configs.add(config_key)
+            if candidates.accepts(score):
+                stats['pushed'] += 1
+                candidates.push(Candidate(
+                    qty, 'grid', (nx, ny), (out_l, out_w, out_h), pack_layout, prod_dims,
+                    yield_per_layer, total, desc, w_kg, score, p_layers, eff, 0,
+                    pallet_dims, Strength(bct, load, sf, unsafe), (L_box, W_box)))
+
+    def _solve_pinwheel(self, candidates, seen_configs, out_l, out_w, out_h, pl_L, pl_W, p_layers, qty, w_kg, bct, load, sf, unsafe, pack_layout, prod_dims, pallet_dims, min_lq, max_lq, stats):
+        box_orients = [(out_l, out_w), (out_w, out_l)] if out_l != out_w else [(out_l, out_w)]
+        for (L_box, W_box) in box_orients:
+            max_k = int(L_box // W_box) + 2
+            for k in range(1, max_k + 2):
+                block_size = L_box + (k * W_box)
+                if block_size <= min(pl_L, pl_W):
+                    yield_per_layer = 4 * k
+                    
+                    if yield_per_layer < min_lq or (max_lq > 0 and yield_per_layer > max_lq):
+                        stats['rej_layer_qty'] += 1
+                        continue
+                    stats['configs'] += 1
+
+                    total = yield_per_layer * p_layers * qty
+                    eff = (out_l * out_w * yield_per_layer) / (pl_L * pl_W) * 100
+                    
+                    desc = "pat_pinwheel" if k == 1 else "pat_expanded"
+                    score = total + 20 
+                    if unsafe: score -= 500
+                    
+                    box_sorted = tuple(sorted([out_l, out_w, out_h]))
+                    config_key = (qty, total, desc, int(eff), box_sorted)
+                    
+                    if config_key in seen_configs:
+                        stats['dedup_hits'] += 1
+                        continue
+                    seen_configs.add(config_key)
+                    if candidates.accepts(score):
+                        stats['pushed'] += 1
+                        candidates.push(Candidate(
+                            qty, 'pinwheel', (0, 0), (out_l, out_w, out_h), pack_layout, prod_dims,
+                            yield_per_layer, total, desc, w_kg, score, p_layers, eff, k,
+                            pallet_dims, Strength(bct, load, sf, unsafe), (L_box, W_box)))
+
+    def _solve_block(self, candidates, seen_configs, out_l, out_w, out_h, pl_L, pl_W, p_layers, qty, w_kg, bct, load, sf, unsafe, pack_layout, prod_dims, pallet_dims, min_lq, max_lq, stats):
+        # 면적 상한(+핀휠과 같은 가점)으로도 K위에 못 들면 풀지 않음
+        max_yield = (pl_L * pl_W) // (out_l * out_w)
+        if max_lq > 0: max_yield = min(max_yield, max_lq)
+        if max_yield < min_lq or not candidates.accepts(max_yield * p_layers * qty + 20): return
+        lay = self._block_layer(pl_L, pl_W, out_l, out_w, stats)
+        if lay is None: return
+        yield_per_layer, placements = lay[0], lay[1]
+        if yield_per_layer < min_lq or (max_lq > 0 and yield_per_layer > max_lq):
+            stats['rej_layer_qty'] += 1
+            return
+        stats['configs'] += 1
+
+        L_box, W_box = max(out_l, out_w), min(out_l, out_w)
+        total = yield_per_layer * p_layers * qty
+        eff = (out_l * out_w * yield_per_layer) / (pl_L * pl_W) * 100
+        desc = "pat_block"
+        score = total + 20
+        if unsafe: score -= 500
+
+        box_sorted = tuple(sorted([out_l, out_w, out_h]))
+        config_key = (qty, total, desc, int(eff), box_sorted)
+        if config_key in seen_configs:
+            stats['dedup_hits'] += 1
+            return
+        seen_configs.add(config_key)
+        if candidates.accepts(score):
+            stats['pushed'] += 1
+            n_long = sum(1 for p in placements if p[2] == L_box)
+            candidates.push(Candidate(
+                qty, 'block', (n_long, yield_per_layer - n_long), (out_l, out_w, out_h), pack_layout, prod_dims,
+                yield_per_layer, total, desc, w_kg, score, p_layers, eff, 0,
+                pallet_dims, Strength(bct, load, sf, unsafe), (L_box, W_box), placements))
+
+    def _block_layer(self, pl_L, pl_W, out_l, out_w, stats):
+        # 캐시에 없으면 풀되, 검색 1회 예산(BLOCK_SEARCH_BUDGET)을 넘으면 새로 풀지 않음
+        key = (pl_L, pl_W, max(out_l, out_w), min(out_l, out_w))
+        hit = yield_table.lookup(self._yields, out_l, out_w)
+        simple = int(hit['best']) if hit is not None else None
+        if simple is not None and (pl_L * pl_W) // (out_l * out_w) <= simple: return None
+        with _BLOCK_LOCK:
+            if key in BLOCK_CACHE:
+                BLOCK_CACHE.move_to_end(key)
+                return BLOCK_CACHE[key]
+        if self._block_spent >= BLOCK_SEARCH_BUDGET:
+            stats['block_skipped'] += 1
+            return None
+        t0 = time.perf_counter()
+        lay = solve_block_layer(*key, simple=simple)
+        self._block_spent += time.perf_counter() - t0
+        stats['block_solved'] += 1
+        if lay and lay[2]: stats['block_capped'] += 1
+        with _BLOCK_LOCK:
+            BLOCK_CACHE[key] = lay
+            while len(BLOCK_CACHE) > BLOCK_CACHE_MAX: BLOCK_CACHE.popitem(last=False)
+        return lay
+
+    # ------------------------------------------
+    # NumPy 벡터화 엔진 (find_candidates와 동일한 순위)
+    # ------------------------------------------
+    DESC_KEYS = ["pat_no_int", "pat_box_rot", "pat_pinwheel", "pat_expanded", "pat_block"]
+    NP_CHUNK_CELLS = 200000
+
+    PRECAND_HEADROOM = 2
+
+    # iter_candidates_np: 칸이 이보다 많거나 블록 배치면 NP_STREAM_SHARDS 조각으로 나눠 계산
+    NP_STREAM_CELLS = 50000
+    NP_STREAM_SHARDS = 8
+
+    @staticmethod
+    def precandidate_key(p_dims_input, box_margin, pallet_dims, allow_rotation):
+        return (tuple(p_dims_input), bool(allow_rotation), pallet_dims[0], pallet_dims[1], box_margin)
+
+    def find_candidates_np(self, p_dims_input, p_weight_g, max_box_w_g, box_type_idx, box_margin, min_qty, max_qty, pallet_dims, allow_rotation, stack_limit, min_layer_qty, max_layer_qty, block_layers=False, pareto=(), top_k=12, packs=None, shard=None):
+        # shard=(i, n): 박스 치수 해시가 i 인 칸만 계산, 결과는 merge_shards 용 (순번, 후보) 목록
+        if max_box_w_g <= 0: max_box_w_g = 999999
+        if p_weight_g <= 0: p_weight_g = 1
+        if min(p_dims_input) <= 0: raise ValueError("product dims must be positive")
+        limit_qty_by_weight = int(max_box_w_g / p_weight_g)
+        t_start = time.perf_counter()
+        stats = self.search_stats = new_search_stats('np')
+        pareto = pareto_objectives(pareto)
+        self._block_spent = 0.0
+        with timed(stats, 'yield_table'):
+            self._yields = yield_table.get_table(pallet_dims[0], pallet_dims[1])
+        stats['yield_table'] = self._yields is not None
+
+        # 필터 값(수량/무게/단수/층당 개수)만 바뀌었으면 저장된 사전 후보를 다시 거르기만 함
+        key = self.precandidate_key(p_dims_input, box_margin, pallet_dims, allow_rotation)
+        cr_cap = max(0, min(max_qty, limit_qty_by_weight))
+        pre = getattr(self, '_pre', None)
+        if pre is not None and pre.covers(key, cr_cap):
+            stats['precand'] = 'reuse'
+        else:
+            with timed(stats, 'precand'):
+                pre = self._pre = self.build_precandidates(p_dims_input, box_margin, pallet_dims, allow_rotation,
+                                                           cr_cap * self.PRECAND_HEADROOM, packs)
+            stats['precand'] = 'build'
+        stats['precand_bytes'] = pre.nbytes
+
+        result = self.rank_precandidates(pre, p_weight_g, limit_qty_by_weight, box_type_idx, min_qty, max_qty,
+                                         pallet_dims, stack_limit, min_layer_qty, max_layer_qty, block_layers, pareto, top_k, stats, shard)
+        add_ms(stats, 'search', time.perf_counter() - t_start)
+        return result
+
+    def iter_candidates_np(self, p_dims_input, p_weight_g, max_box_w_g, box_type_idx, box_margin, min_qty, max_qty, pallet_dims, allow_rotation, stack_limit, min_layer_qty, max_layer_qty, block_layers=False, pareto=(), top_k=12, deadline=None, cancel=None):
+        # iter_candidates 와 같은 (진행률, 현재 상위 K, 상태) 를 NumPy 엔진으로, 'done' 의 목록은 find_candidates_np 와 같음
+        # 작은 질의는 한 번에 (마지막 1번만 yield), 큰 질의 / 블록 배치는 샤드(박스 치수 해시) 하나씩 계산하며
+        # 조각마다 합친 상위 K 를 yield 하고 다음 조각 전에 마감/취소 확인 (_pre 는 첫 조각에서 만들고 재사용)
+        args = (p_dims_input, p_weight_g, max_box_w_g, box_type_idx, box_margin, min_qty, max_qty, pallet_dims,
+                allow_rotation, stack_limit, min_layer_qty, max_layer_qty, block_layers, pareto, top_k)
+        triples = self.canonical_triples(self.product_orientations(p_dims_input, allow_rotation))
+        n_cells = sum(int(pallet_dims[0] // d1) * int(pallet_dims[1] // d2) for _, (d1, d2), _ in triples) if min(p_dims_input) > 0 else 0
+        if not block_layers and n_cells <= self.NP_STREAM_CELLS:
+            items = self.find_candidates_np(*args)
+            self.search_stats.update(stopped='done', progress=1.0)
+            yield 1.0, items, 'done'
+            return
+        n = self.NP_STREAM_SHARDS
+        parts, stats_list, state = [], [], 'done'
+        for i in range(n):
+            if i and cancel is not None and cancel.is_set():
+                state = 'cancelled'
+                break
+            if i and deadline is not None and time.monotonic() >= deadline:
+                state = 'deadline'
+                break
+            parts.append(self.find_candidates_np(*args, shard=(i, n)))
+            stats_list.append(self.search_stats)
+            if i + 1 < n: yield (i + 1) / n, merge_shards(parts, top_k, pareto), 'running'
+        items = merge_shards(parts, top_k, pareto)
+        stats = self.search_stats = merge_shard_stats(stats_list, concurrent=False)
+        stats['emitted'] = len(items)
+        stats.update(stopped=state, progress=round(len(parts) / n, 3))
+        yield len(parts) / n, items, state
+
+    @staticmethod
+    def product_orientations(p_dims_input, allow_rotation):
+        # 회전 허용이면 입력 순서와 무관하게 정렬된 순서 (동점 후보는 먼저 본 방향이 남으므로 순회 순서가 결과를 정함)
+        if not allow_rotation: return [tuple(p_dims_input)]
+        return sorted(set(itertools.permutations(p_dims_input)))
+
+    SKIP_SYMMETRY = True  # False 면 대칭 중복도 모두 계산 (회귀 테스트에서 결과 비교용)
+
+    @classmethod
+    def canonical_triples(cls, prod_orientations):
+        # 제품 방향 x 박스 방향(2) 순회에서 (d1, d2, p_H) 가 처음 나올 때만: [(제품 방향, (d1, d2), mirrored)]
+        # mirrored: (d2, d1, p_H) 를 이미 봤음 (d1 == d2 면 자기 자신) -> 회전 칸 (r, c) 이 먼저 계산됐을 수 있음
+        seen, out = set(), []
+        for (p_L, p_W, p_H) in prod_orientations:
+            for d1, d2 in [(p_L, p_W), (p_W, p_L)]:
+                if not cls.SKIP_SYMMETRY:
+                    out.append(((p_L, p_W, p_H), (d1, d2), False))
+                    continue
+                if (d1, d2, p_H) in seen: continue
+                seen.add((d1, d2, p_H))
+                out.append(((p_L, p_W, p_H), (d1, d2), (d2, d1, p_H) in seen))
+        return out
+
+    def build_packs(self, p_dims_input, box_margin, allow_rotation, max_L, max_W):
+        # 여러 파레트 비교용: 가장 큰 바닥까지의 (c, r) 칸을 제품 방향별로 한 번만 계산
+        grids = {}
+        for (p_L, p_W, p_H), (d1, d2), _ in self.canonical_triples(self.product_orientations(p_dims_input, allow_rotation)):
+            grids[(d1, d2, p_H)] = self._np_pack_grid(d1, d2, p_H, int(max_L // d1), int(max_W // d2), box_margin)
+        return PackCells((tuple(p_dims_input), bool(allow_rotation), box_margin), max_L, max_W, grids)
+
+    def _np_pack_grid(self, d1, d2, p_H, max_c, max_r, box_margin):
+        c, r = np.meshgrid(np.arange(1, max_c + 1, dtype=np.int64), np.arange(1, max_r + 1, dtype=np.int64), indexing='ij')
+        out_l = c * d1 + box_margin
+        out_w = r * d2 + box_margin
+        long_side = np.maximum(out_l, out_w)
+        short_side = np.minimum(out_l, out_w)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            aspect_ok = ~((short_side > 0) & (long_side / short_side > 3.5))
+        max_stable_height = np.where(long_side > 0, long_side * 0.7, 9999)
+        geo_max_layers = np.maximum(1, ((max_stable_height - box_margin) // p_H).astype(np.int64))
+        return {'c': c, 'r': r, 'out_l': out_l, 'out_w': out_w, 'aspect_ok': aspect_ok, 'geo': geo_max_layers}
+
+    def build_precandidates(self, p_dims_input, box_margin, pallet_dims, allow_rotation, cr_cap, packs=None):
+        pl_L, pl_W = pallet_dims[0], pallet_dims[1]
+        prod_orientations = self.product_orientations(p_dims_input, allow_rotation)
+        triples = self.canonical_triples(prod_orientations)
+        counts = {'orientations': len(prod_orientations), 'cells': 0, 'rej_fit': 0, 'rej_aspect': 0,
+                  'sym_orientations': 2 * len(prod_orientations) - len(triples), 'sym_cells': 0}
+        table = yield_table.get_table(pl_L, pl_W)
+        if packs is not None and not packs.covers((tuple(p_dims_input), bool(allow_rotation), box_margin), pl_L, pl_W):
+            packs = None
+
+        # 순회 순서(방향 -> 박스 방향 -> c -> r)대로 블록을 쌓아야 원래의 중복 제거/정렬 순서가 유지됨
+        # 중복 (d1, d2, p_H) 와 이미 본 칸의 90도 회전 칸은 find_candidates 와 같이 생략
+        blocks, cell_parts, row_parts, excluded = [], [], [], []
+        n_cells = 0
+        for (p_L, p_W, p_H), (d1, d2), mirrored in triples:
+            max_c_prod = int(pl_L // d1)
+            max_r_prod = int(pl_W // d2)
+            if max_c_prod < 1 or max_r_prod < 1: continue
+            if packs is not None:
+                grid = {k: v[:max_c_prod, :max_r_prod] for k, v in packs.grids[(d1, d2, p_H)].items()}
+            else:
+                grid = self._np_pack_grid(d1, d2, p_H, max_c_prod, max_r_prod, box_margin)
+            if mirrored:
+                c, r = grid['c'], grid['r']
+                keep = ~((c <= pl_W // d1) & (r <= pl_L // d2) & ((d1 != d2) | (r < c)))
+                counts['sym_cells'] += int(keep.size - np.count_nonzero(keep))
+            step = max(1, self.NP_CHUNK_CELLS // max_r_prod)
+            for c_lo in range(0, max_c_prod, step):
+                chunk = {k: v[c_lo:c_lo + step].ravel() for k, v in grid.items()}
+                if mirrored:
+                    sel = keep[c_lo:c_lo + step].ravel()
+                    chunk = {k: v[sel] for k, v in chunk.items()}
+                cells = self._np_geo_cells(chunk, p_H, pl_L, pl_W, cr_cap, counts, excluded)
+                if cells is None: continue
+                rows = self._np_geo_rows(cells, pl_L, pl_W, table)
+                cells['block'] = np.full(len(cells['c']), len(blocks), dtype=np.int32)
+                blocks.append(((p_L, p_W, p_H), (d1, d2)))
+                rows['cell'] += n_cells
+                n_cells += len(cells['c'])
+                cell_parts.append(cells)
+                row_parts.append(rows)
+
+        if cell_parts:
+            cells = {k: np.concatenate([p[k] for p in cell_parts]) for k in cell_parts[0]}
+            rows = {k: np.concatenate([p[k] for p in row_parts]) for k in row_parts[0]}
+        else:
+            cells, rows = {}, {}
+        if excluded:
+            vals, inv = np.unique(np.concatenate([v for v, _ in excluded]), return_inverse=True)
+            excl_cum = np.cumsum(np.bincount(inv, weights=np.concatenate([n for _, n in excluded])).astype(np.int64))
+        else:
+            vals, excl_cum = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        key = self.precandidate_key(p_dims_input, box_margin, pallet_dims, allow_rotation)
+        return PreCandidates(key, cr_cap, box_margin, blocks, cells, rows, counts, vals, excl_cum)
+
+    @staticmethod
+    def _np_filter(stats, key, ok, cond):
+        stats[key] += int(np.count_nonzero(ok & ~cond))
+        return ok & cond
+
+    def _np_geo_cells(self, grid, p_H, pl_L, pl_W, cr_cap, counts, excluded):
+        c, r, out_l, out_w = grid['c'], grid['r'], grid['out_l'], grid['out_w']
+        counts['cells'] += c.size
+        ok = np.ones(c.size, dtype=bool)
+        ok = self._np_filter(counts, 'rej_fit', ok, ~((out_l > pl_L) & (out_l > pl_W)) & ~((out_w > pl_L) & (out_w > pl_W)))
+        ok = self._np_filter(counts, 'rej_aspect', ok, grid['aspect_ok'])
+
+        # c*r > cr_cap 은 무게/최대 수량 필터에 반드시 걸림: 개수만 c*r 별로 기록
+        cr = c * r
+        far = ok & (cr > cr_cap)
+        if far.any():
+            excluded.append(np.unique(cr[far], return_counts=True))
+        idx = np.flatnonzero(ok & ~far)
+        if idx.size == 0: return None
+        return {
+            'c': c[idx].astype(np.int32), 'r': r[idx].astype(np.int32), 'p_H': np.full(idx.size, p_H),
+            'out_l': out_l[idx], 'out_w': out_w[idx], 'geo': grid['geo'][idx].astype(np.int32),
+        }
+
+    def _np_geo_rows(self, cells, pl_L, pl_W, table=None):
+        # 칸마다 가능한 패턴 (층당 개수 필터 전): 칸 순서 -> sub(격자 o, 핀휠 2+o*1000+k) 순
+        out_l, out_w = cells['out_l'], cells['out_w']
+        cell_ids, subs, ptypes, orients, nxs, nys, ks, yields, descs = ([] for _ in range(9))
+        # 정수 치수면 테이블에서 바로 (o=0 은 [out_l, out_w], o=1 은 [out_w, out_l])
+        tabs = (yield_table.lookup(table, out_l, out_w), yield_table.lookup(table, out_w, out_l))
+        if tabs[0] is None: tabs = None
+
+        # Grid: (out_l, out_w), (out_w, out_l)
+        for o, (L_box, W_box) in enumerate([(out_l, out_w), (out_w, out_l)]):
+            if tabs is not None:
+                nx = tabs[o]['nx'].astype(np.int64)
+                ny = tabs[o]['ny'].astype(np.int64)
+            else:
+                nx = (pl_L // L_box).astype(np.int64)
+                ny = (pl_W // W_box).astype(np.int64)
+            y = nx * ny
+            # 정사각 바닥이면 두 번째 방향은 첫 번째와 같은 배치
+            sel = np.flatnonzero((y != 0) & ((out_l != out_w) if o == 1 else True))
+            desc = np.where((nx[sel] == ny[sel]) & (np.abs(L_box[sel] - W_box[sel]) < 10), 1, 0)
+            cell_ids.append(sel); subs.append(np.full(sel.size, o, dtype=np.int64)); ptypes.append(np.zeros(sel.size, dtype=np.int64))
+            orients.append(np.full(sel.size, o, dtype=np.int64)); nxs.append(nx[sel]); nys.append(ny[sel])
+            ks.append(np.zeros(sel.size, dtype=np.int64)); yields.append(y[sel]); descs.append(desc)
+
+        # Pinwheel: k = 1 .. max_k+1, block_size <= min(pl_L, pl_W)
+        short_pl = min(pl_L, pl_W)
+        for o, (L_box, W_box) in enumerate([(out_l, out_w), (out_w, out_l)]):
+            if tabs is not None:
+                # 칸마다 k = 1..kmax
+                kmax = tabs[o]['kmax'].astype(np.int64)
+                if o == 1: kmax = np.where(out_l != out_w, kmax, 0)
+                sel = np.repeat(np.arange(kmax.size), kmax)
+                k = np.arange(sel.size, dtype=np.int64) - np.repeat(np.cumsum(kmax) - kmax, kmax) + 1
+            else:
+                k_cap = (L_box // W_box).astype(np.int64) + 3
+                k_range = np.arange(1, int(k_cap.max()) + 1, dtype=np.int64)
+                block_size = L_box[:, None] + k_range[None, :] * W_box[:, None]
+                allowed = (k_range[None, :] <= k_cap[:, None]) & (block_size <= short_pl)
+                if o == 1: allowed &= (out_l != out_w)[:, None]
+                sel, k_idx = np.nonzero(allowed)
+                k = k_range[k_idx]
+            cell_ids.append(sel); subs.append(2 + o * 1000 + k); ptypes.append(np.ones(sel.size, dtype=np.int64))
+            orients.append(np.full(sel.size, o, dtype=np.int64)); nxs.append(np.zeros(sel.size, dtype=np.int64)); nys.append(np.zeros(sel.size, dtype=np.int64))
+            ks.append(k); yields.append(4 * k); descs.append(np.where(k == 1, 2, 3))
+
+        cell_id = np.concatenate(cell_ids)
+        order = np.lexsort((np.concatenate(subs), cell_id))
+        return {
+            'cell': cell_id[order].astype(np.int32),
+            'ptype': np.concatenate(ptypes)[order].astype(np.int8),
+            'o': np.concatenate(orients)[order].astype(np.int8),
+            'nx': np.concatenate(nxs)[order].astype(np.int32),
+            'ny': np.concatenate(nys)[order].astype(np.int32),
+            'k': np.concatenate(ks)[order].astype(np.int32),
+            'yield': np.concatenate(yields)[order].astype(np.int32),
+            'desc': np.concatenate(descs)[order].astype(np.int8),
+        }
+
+    def rank_precandidates(self, pre, p_weight_g, limit_qty_by_weight, box_type_idx, min_qty, max_qty, pallet_dims, stack_limit, min_lq, max_lq, block_layers, pareto, top_k, stats, shard=None):
+        pl_L, pl_W, pl_H = pallet_dims
+        for key, n in pre.counts.items(): stats[key] += n
+        # cr_cap 밖의 칸: 무게 -> 최대 수량 순으로 원인 배정
+        n_far = int(pre.excl_cum[-1]) if pre.excl_cum.size else 0
+        i = int(np.searchsorted(pre.excl_cr, limit_qty_by_weight, side='right'))
+        n_light = int(pre.excl_cum[i - 1]) if i > 0 else 0
+        stats['rej_weight'] += n_far - n_light
+        stats['rej_max_qty'] += n_light
+        if not pre.cells: return []
+        cells = pre.cells
+
+        with timed(stats, 'filter'):
+            c = cells['c'].astype(np.int64)
+            r = cells['r'].astype(np.int64)
+            cr = c * r
+            weight_max_layers = limit_qty_by_weight // cr
+            user_max_layers = max_qty // cr
+            safe_layers = np.minimum(np.minimum(weight_max_layers, cells['geo'].astype(np.int64)),
+                                     np.minimum(user_max_layers, stack_limit))
+            # safe_layers < 1 은 무게 -> 최대 수량 -> 적재 단수 순으로 원인 배정
+            ok = np.ones(cr.size, dtype=bool)
+            ok = self._np_filter(stats, 'rej_weight', ok, weight_max_layers >= 1)
+            ok = self._np_filter(stats, 'rej_max_qty', ok, user_max_layers >= 1)
+            ok = self._np_filter(stats, 'rej_stack', ok, safe_layers >= 1)
+            qty = cr * safe_layers
+            ok = self._np_filter(stats, 'rej_min_qty', ok, qty >= min_qty)
+            out_h = safe_layers * cells['p_H'] + pre.margin
+            with np.errstate(divide='ignore', invalid='ignore'):
+                p_layers = (pl_H // np.where(ok, out_h, 1)).astype(np.int64)
+            ok = self._np_filter(stats, 'rej_height', ok, p_layers >= 1)
+            stats['branches'] += int(np.count_nonzero(ok))
+            stats['sym_square'] += int(np.count_nonzero(ok & (cells['out_l'] == cells['out_w'])))
+            if shard is not None:
+                ok &= self._np_shard_of(cells['out_l'], cells['out_w'], out_h, shard[1]) == shard[0]
+                stats['shard_cells'] = int(np.count_nonzero(ok))
+
+            y = pre.rows['yield'].astype(np.int64)
+            cell_ok = ok[pre.rows['cell']]
+            y_ok = y >= min_lq
+            if max_lq > 0: y_ok &= y <= max_lq
+            stats['rej_layer_qty'] += int(np.count_nonzero(cell_ok & ~y_ok))
+            sel = np.flatnonzero(cell_ok & y_ok)
+            stats['configs'] += int(sel.size)
+        pick = {key: pre.rows[key][sel] for key in ('cell', 'o', 'ptype', 'nx', 'ny', 'k', 'yield', 'desc')}
+        pick['lay'] = np.full(sel.size, -1, dtype=np.int32)
+        if sel.size == 0 and not block_layers: return []
+
+        layer_ctx = (cells, c, r, safe_layers, qty, out_h, p_layers, p_weight_g, box_type_idx, pallet_dims)
+        rows = self._np_expand(pick, layer_ctx, stats)
+        order = self._np_rank(rows, top_k, pareto, stats)
+
+        layouts = []
+        if block_layers:
+            # 격자/핀휠만으로 정한 K위 점수가 기준 (블록 행이 더해지면 기준은 오르기만 함), 파레토 모드는 기준 없음
+            thr = rows['score'][order[-1]] if len(order) >= top_k and not pareto else None
+            extra = self._np_block_rows(cells, ok, qty, p_layers, thr, pallet_dims, min_lq, max_lq, layouts, stats)
+            if extra is not None:
+                # 칸 안에서는 격자 -> 핀휠 -> 블록 순 (find_candidates 와 같은 등장 순서)
+                pick = {key: np.concatenate([pick[key], extra[key]]) for key in pick}
+                by_cell = np.argsort(pick['cell'], kind='stable')
+                pick = {key: val[by_cell] for key, val in pick.items()}
+                rows = self._np_expand(pick, layer_ctx, stats)
+                order = self._np_rank(rows, top_k, pareto, stats)
+
+        has_bct = bool(self.MATERIAL_PROPS.get(box_type_idx))
+        with timed(stats, 'build'):
+            result = [self._np_candidate(rows, i, pre.blocks, layouts, pallet_dims, has_bct) for i in order]
+        stats['pushed'] = stats['emitted'] = len(result)
+        if shard is None: return result
+        # 순번 = 칸 번호 * SEQ_STRIDE + 칸 안 순서 (pick 은 칸 순으로 정렬돼 있고 한 칸의 행은 모두 같은 샤드)
+        cell = pick['cell'].astype(np.int64)
+        seq = cell * SEQ_STRIDE + np.arange(cell.size) - np.searchsorted(cell, cell)
+        return [(int(seq[i]), cand) for i, cand in zip(order, result)]
+
+    @staticmethod
+    def _np_shard_of(out_l, out_w, out_h, n):
+        # 정렬한 박스 치수 (0.001 mm 단위) 해시 -> 0..n-1, 프로세스와 무관하게 같은 값
+        dims = np.sort(np.rint(np.column_stack([out_l, out_w, out_h]) * 1000).astype(np.int64), axis=1).astype(np.uint64)
+        h = dims[:, 0] * np.uint64(0x9E3779B97F4A7C15) ^ dims[:, 1] * np.uint64(0xC2B2AE3D27D4EB4F) ^ dims[:, 2] * np.uint64(0x165667B19E3779F9)
+        h ^= h >> np.uint64(31)
+        h *= np.uint64(0xBF58476D1CE4E5B9)
+        h ^= h >> np.uint64(29)
+        return (h % np.uint64(n)).astype(np.int64)
+
+    def _np_expand(self, pick, layer_ctx, stats):
+        cells, c, r, safe_layers, qty, out_h, p_layers, p_weight_g, box_type_idx, pallet_dims = layer_ctx
+        pl_L, pl_W = pallet_dims[0], pallet_dims[1]
+        with timed(stats, 'rows'):
+            cid = pick['cell']
+            rows = {'c': c[cid], 'r': r[cid], 'safe_layers': safe_layers[cid], 'qty': qty[cid],
+                    'out_l': cells['out_l'][cid], 'out_w': cells['out_w'][cid], 'out_h': out_h[cid],
+                    'p_layers': p_layers[cid], 'block': cells['block'][cid].astype(np.int64)}
+            rows['weight'] = (rows['qty'] * p_weight_g) / 1000.0
+            props = self.MATERIAL_PROPS.get(box_type_idx)
+            if props:
+                perimeter = (rows['out_l'] + rows['out_w']) * 2
+                rows['bct'] = 5.87 * props['ect'] * np.sqrt(props['thick'] * perimeter) / 9.80665 * 1000
+            else:
+                rows['bct'] = np.zeros(cid.size)
+            stack_load = rows['weight'] * (rows['p_layers'] - 1)
+            rows['load'] = np.where(stack_load <= 0, 0.1, stack_load)
+            rows['sf'] = rows['bct'] / rows['load']
+            rows['unsafe'] = rows['sf'] < 3.0
+            o = pick['o']
+            rows['L_box'] = np.where(o == 0, rows['out_l'], rows['out_w'])
+            rows['W_box'] = np.where(o == 0, rows['out_w'], rows['out_l'])
+            for key in ('ptype', 'nx', 'ny', 'k', 'yield', 'desc', 'lay'):
+                rows[key] = pick[key].astype(np.int64)
+            rows['total'] = rows['yield'] * rows['p_layers'] * rows['qty']
+            rows['eff'] = (rows['out_l'] * rows['out_w'] * rows['yield']) / (pl_L * pl_W) * 100
+            rows['score'] = rows['total'] + np.where(rows['ptype'] != 0, 20, 0) - np.where(rows['unsafe'], 500, 0)
+        return rows
+
+    def _np_rank(self, rows, top_k, pareto, stats):
+        if rows['score'].size == 0: return np.zeros(0, dtype=np.int64)
+        # seen_configs와 동일: (qty, total, desc, int(eff), box_sorted) 최초 등장만 유지
+        with timed(stats, 'dedup'):
+            box_sorted = np.sort(np.column_stack([rows['out_l'], rows['out_w'], rows['out_h']]), axis=1)
+            keys = np.column_stack([rows['qty'], rows['total'], rows['desc'], np.trunc(rows['eff']), box_sorted])
+            _, first_idx = np.unique(keys, axis=0, return_index=True)
+            keep = np.sort(first_idx)
+        stats['dedup_hits'] = len(rows['score']) - len(keep)
+
+        # 안정 정렬(score 내림차순, 동점은 등장 순서)
+        with timed(stats, 'rank'):
+            if pareto: return self._np_pareto(rows, keep, pareto)
+            return keep[np.lexsort((keep, -rows['score'][keep]))][:top_k]
+
+    def _np_pareto(self, rows, keep, pareto):
+        # ParetoArchive 와 같은 결과: 목적값 사전식 내림차순(동률은 등장 순서)으로 훑으며
+        # 맨 앞 후보를 남기고 그 후보가 지배(또는 같음)하는 후보를 모두 제거
+        cols = {'total': rows['total'], 'sf': rows['sf'], 'efficiency': rows['eff'], 'boxes': rows['yield'] * rows['p_layers']}
+        vec = np.column_stack([PARETO_OBJECTIVES[k] * cols[k][keep].astype(np.float64) for k in pareto])
+        idx = np.lexsort((keep,) + tuple(-vec[:, j] for j in reversed(range(vec.shape[1]))))
+        front = []
+        while idx.size:
+            head = idx[0]
+            front.append(head)
+            idx = idx[~np.all(vec[idx] <= vec[head], axis=1)]
+        return keep[np.array(front, dtype=np.int64)]
+
+    def _np_block_rows(self, cells, ok, qty, p_layers, thr, pallet_dims, min_lq, max_lq, layouts, stats):
+        pl_L, pl_W = pallet_dims[0], pallet_dims[1]
+        idx = np.flatnonzero(ok)
+        out_l, out_w = cells['out_l'][idx], cells['out_w'][idx]
+        max_yield = (pl_L * pl_W) // (out_l * out_w)
+        if max_lq > 0: max_yield = np.minimum(max_yield, max_lq)
+        hope = max_yield >= min_lq
+        if thr is not None: hope &= max_yield * p_layers[idx] * qty[idx] + 20 >= thr
+        hit = yield_table.lookup(self._yields, out_l, out_w)
+        if hit is not None: hope &= (pl_L * pl_W) // (out_l * out_w) > hit['best']
+
+        found = {key: [] for key in ('cell', 'o', 'ptype', 'nx', 'ny', 'k', 'yield', 'desc', 'lay')}
+        lay_ids = {}
+        block_desc = self.DESC_KEYS.index("pat_block")
+        with timed(stats, 'solve_block'):
+            for i in idx[hope].tolist():
+                ol, ow = cells['out_l'][i].item(), cells['out_w'][i].item()
+                lay = self._block_layer(pl_L, pl_W, ol, ow, stats)
+                if lay is None: continue
+                n, placements = lay[0], lay[1]
+                if n < min_lq or (max_lq > 0 and n > max_lq):
+                    stats['rej_layer_qty'] += 1
+                    continue
+                stats['configs'] += 1
+                L_box = max(ol, ow)
+                if placements not in lay_ids:
+                    lay_ids[placements] = len(layouts)
+                    layouts.append(placements)
+                n_long = sum(1 for p in placements if p[2] == L_box)
+                for key, v in (('cell', i), ('o', 0 if ol >= ow else 1), ('ptype', 2), ('nx', n_long), ('ny', n - n_long),
+                               ('k', 0), ('yield', n), ('desc', block_desc), ('lay', lay_ids[placements])):
+                    found[key].append(v)
+        if not found['cell']: return None
+        return {key: np.array(v, dtype=np.int64) for key, v in found.items()}
+
+    def _np_candidate(self, rows, i, blocks, layouts, pallet_dims, has_bct):
+        v = {key: val[i].item() for key, val in rows.items()}
+        prod_dims, (d1, d2) = blocks[v['block']]
+        pack_layout = (d1, d2, prod_dims[2], v['c'], v['r'], v['safe_layers'])
+        placements = ()
+        if v['ptype'] == 1:
+            pattern_type, pattern_dims = 'pinwheel', (0, 0)
+        elif v['ptype'] == 2:
+            pattern_type, pattern_dims, placements = 'block', (v['nx'], v['ny']), layouts[v['lay']]
+        else:
+            pattern_type, pattern_dims = 'grid', (v['nx'], v['ny'])
+        bct = v['bct'] if has_bct else 0
+        return Candidate(
+            v['qty'], pattern_type, pattern_dims, (v['out_l'], v['out_w'], v['out_h']), pack_layout, prod_dims,
+            v['yield'], v['total'], self.DESC_KEYS[v['desc']], v['weight'], v['score'], v['p_layers'], v['eff'], v['k'],
+            pallet_dims, Strength(bct, v['load'], v['sf'], v['unsafe']), (v['L_box'], v['W_box']), placements)
+
+    def refit(self, cand, p_dims_input, p_weight_g, max_box_w_g, box_type_idx, box_margin, min_qty, max_qty, pallet_dims, stack_limit, min_layer_qty, max_layer_qty):
+        # cand 의 입수(c x r x 단)/제품 방향/파레트 패턴을 그대로 두고 새 치수·무게로 다시 계산, 안 맞으면 None
+        pl_L, pl_W, pl_H = pallet_dims
+        if max_box_w_g <= 0: max_box_w_g = 999999
+        if p_weight_g <= 0: p_weight_g = 1
+        old_d1, old_d2, old_h, c, r, layers = cand.prod_detail
+        old_rank = sorted(cand.prod_dims_used)
+        new_rank = sorted(p_dims_input)
+        d1, d2, p_H = (new_rank[old_rank.index(v)] for v in (old_d1, old_d2, old_h))
+        prod_dims = tuple(new_rank[old_rank.index(v)] for v in cand.prod_dims_used)
+
+        out_l = c * d1 + box_margin
+        out_w = r * d2 + box_margin
+        if (out_l > pl_L and out_l > pl_W) or (out_w > pl_L and out_w > pl_W): return None
+        long_side, short_side = max(out_l, out_w), min(out_l, out_w)
+        if short_side > 0 and long_side / short_side > 3.5: return None
+        geo_max_layers = max(1, int((long_side * 0.7 - box_margin) // p_H))
+        qty = c * r * layers
+        if layers > min(geo_max_layers, stack_limit) or qty > int(max_box_w_g / p_weight_g): return None
+        if not min_qty <= qty <= max_qty: return None
+        out_h = layers * p_H + box_margin
+        p_layers = int(pl_H // out_h)
+        if p_layers < 1: return None
+
+        # 원래 패턴의 박스 방향 (opt_orient 가 box_outer 와 같은 순서면 0)
+        o = 0 if tuple(cand.opt_orient) == tuple(cand.box_outer[:2]) else 1
+        L_box, W_box = (out_l, out_w) if o == 0 else (out_w, out_l)
+        placements = ()
+        if cand.pattern_type == 'grid':
+            nx, ny = cand.pattern_dims
+            if nx > pl_L // L_box or ny > pl_W // W_box: return None
+            yield_per_layer = nx * ny
+        elif cand.pattern_type == 'pinwheel':
+            if L_box + cand.pinwheel_k * W_box > min(pl_L, pl_W): return None
+            yield_per_layer = 4 * cand.pinwheel_k
+        else:
+            self._yields = yield_table.get_table(pl_L, pl_W)
+            lay = self._block_layer(pl_L, pl_W, out_l, out_w, new_search_stats('refit'))
+            if lay is None or lay[0] < cand.yield_per_layer: return None
+            yield_per_layer, placements = cand.yield_per_layer, lay[1][:cand.yield_per_layer]
+            L_box, W_box = long_side, short_side
+        if yield_per_layer < min_layer_qty or (max_layer_qty > 0 and yield_per_layer > max_layer_qty): return None
+
+        w_kg = (qty * p_weight_g) / 1000.0
+        bct = self.calculate_bct(out_l, out_w, box_type_idx)
+        load = w_kg * (p_layers - 1)
+        if load <= 0: load = 0.1
+        sf = bct / load
+        unsafe = sf < 3.0
+        total = yield_per_layer * p_layers * qty
+        eff = (out_l * out_w * yield_per_layer) / (pl_L * pl_W) * 100
+        score = total + (20 if cand.pattern_type != 'grid' else 0) - (500 if unsafe else 0)
+        return Candidate(
+            qty, cand.pattern_type, cand.pattern_dims, (out_l, out_w, out_h), (d1, d2, p_H, c, r, layers), prod_dims,
+            yield_per_layer, total, cand.interlock_desc_key, w_kg, score, p_layers, eff, cand.pinwheel_k,
+            pallet_dims, Strength(bct, load, sf, unsafe), (L_box, W_box), placements)
+
+    def sweep(self, p_dims_input, p_weight_g, max_box_w_g, box_type_idx, box_margin, min_qty, max_qty, pallet_dims, allow_rotation, stack_limit, min_layer_qty, max_layer_qty, block_layers=False, dim_deltas=(-2, -1, 0, 1, 2), weight_steps=(-0.05, 0, 0.05), top_k=12):
+        # 치수 변화(세 변 모두 +delta mm)마다 사전 후보 1번, 무게는 가벼운 쪽부터 돌며 같은 사전 후보를 재사용
+        t_start = time.perf_counter()
+        dim_deltas = sorted(set(dim_deltas) | {0})
+        weight_steps = sorted(set(weight_steps) | {0})
+        counts = {'builds': 0, 'reuses': 0}
+
+        grid = [[None] * len(dim_deltas) for _ in weight_steps]  # grid[무게][치수]
+        for j, delta in enumerate(dim_deltas):
+            dims = [max(1, d + delta) for d in p_dims_input]
+            for i, step in enumerate(weight_steps):
+                weight = p_weight_g * (1 + step)
+                cands = self.find_candidates_np(dims, weight, max_box_w_g, box_type_idx, box_margin, min_qty, max_qty,
+                                                pallet_dims, allow_rotation, stack_limit, min_layer_qty, max_layer_qty,
+                                                block_layers, top_k=top_k)
+                counts['builds' if self.search_stats['precand'] == 'build' else 'reuses'] += 1
+                grid[i][j] = {'dims': dims, 'weight': weight, 'cands': cands}
+
+        # 기준점(0, 0) 1위 추천을 각 점에서 그대로 다시 맞춰 봄 (refit) + 그 점의 1위가 같은 추천인지
+        nominal = grid[weight_steps.index(0)][dim_deltas.index(0)]['cands']
+        nominal = nominal[0] if nominal else None
+        nominal_key = layout_key(nominal) if nominal else None
+        same = kept = 0
+        for row in grid:
+            for point in row:
+                cands = point.pop('cands')
+                keys = [layout_key(c) for c in cands]
+                top = cands[0] if cands else None
+                point['n'] = len(cands)
+                point['top'] = None if top is None else {
+                    'total': top.total, 'sf': top.strength.sf, 'unsafe': top.strength.unsafe,
+                    'efficiency': top.efficiency, 'qty': top.qty, 'pattern': top.interlock_desc_key}
+                point['same_top'] = bool(keys) and keys[0] == nominal_key
+                point['nominal_rank'] = keys.index(nominal_key) + 1 if nominal_key in keys else None
+                ref = None if nominal is None else self.refit(
+                    nominal, point['dims'], point['weight'], max_box_w_g, box_type_idx, box_margin,
+                    min_qty, max_qty, pallet_dims, stack_limit, min_layer_qty, max_layer_qty)
+                point['nominal_ok'] = ref is not None
+                point['nominal_total'] = ref.total if point['nominal_ok'] else None
+                point['nominal_sf'] = ref.strength.sf if point['nominal_ok'] else None
+                point['nominal_unsafe'] = ref.strength.unsafe if point['nominal_ok'] else None
+                same += point['same_top']
+                kept += point['nominal_ok']
+
+        n_points = len(dim_deltas) * len(weight_steps)
+        return {
+            'dim_deltas': dim_deltas, 'weight_steps': weight_steps, 'grid': grid,
+            'nominal': nominal.to_dict() if nominal else None,
+            'stability': same / n_points, 'kept': kept / n_points, 'points': n_points,
+            'builds': counts['builds'], 'reuses': counts['reuses'],
+            'ms': round((time.perf_counter() - t_start) * 1000, 1),
+        }
+
+# ------------------------------------------
+# 결과 캐시 (메모리 LRU + 선택적 디스크)
+# ------------------------------------------
+CACHE_VERSION = 5
+
+def normalize_search_params(p_dims_input, p_weight_g, max_box_w_g, box_type_idx, box_margin, min_qty, max_qty, pallet_dims, allow_rotation, stack_limit, min_layer_qty=0, max_layer_qty=0, block_layers=False, pareto=()):
+    p_dims = tuple(p_dims_input)
+    if allow_rotation: p_dims = tuple(sorted(p_dims))
+    p_weight_g = float(p_weight_g)
+    if p_weight_g <= 0: p_weight_g = 1.0
+    if max_box_w_g <= 0: max_box_w_g = 999999
+    min_layer_qty = max(0, int(min_layer_qty or 0))
+    max_layer_qty = max(0, int(max_layer_qty or 0))
+    return (p_dims, p_weight_g, max_box_w_g, int(box_type_idx), box_margin, int(min_qty), int(max_qty),
+            tuple(pallet_dims), bool(allow_rotation), int(stack_limit), min_layer_qty, max_layer_qty, bool(block_layers), pareto_objectives(pareto))
+
+class ResultCache:
+    # 디스크는 여러 프로세스가 같이 씀: disk_max_bytes 넘으면 오래 안 쓴 파일(mtime)부터 지움
+    # (이 프로세스가 disk_max_bytes / 8 만큼 쓸 때마다 디렉터리를 다시 훑음, 첫 쓰기 때도)
+    def __init__(self, max_bytes=32 * 1024 * 1024, disk_dir=None, disk_max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._mem = OrderedDict()
+        self._mem_bytes = 0
+        self._disk_written = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evicted = 0
+        if disk_dir: os.makedirs(disk_dir, exist_ok=True)
+
+    def find_candidates(self, sim, *args, stats=None):
+        # stats: 호출자 소유 dict (캐시는 세션 간 공유되므로 자신에게 저장하지 않음)
+        if stats is None: stats = {}
+        candidates = self.get(*args, stats=stats)
+        if candidates is None:
+            candidates = sim.find_candidates_np(*normalize_search_params(*args))
+            stats.update(sim.search_stats)
+            self.put(candidates, *args)
+        return candidates
+
+    def get(self, *args, stats=None):
+        # 메모리/디스크에 있으면 후보 목록, 없으면 None (miss 로 셈, 끝까지 돈 결과만 put 할 것)
+        if stats is None: stats = {}
+        key = self._key(*args)
+        with self._lock:
+            blob = self._mem.get(key)
+            if blob is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                stats['cache'] = 'memory'
+                return pickle.loads(blob)
+
+        blob = self._read_disk(key)
+        if blob is None:
+            with self._lock: self.misses += 1
+            stats['cache'] = 'miss'
+            return None
+        with self._lock: self.disk_hits += 1
+        stats['cache'] = 'disk'
+        self._put(key, blob)
+        return pickle.loads(blob)
+
+    def put(self, candidates, *args):
+        key = self._key(*args)
+        blob = pickle.dumps(candidates, protocol=pickle.HIGHEST_PROTOCOL)
+        self._write_disk(key, blob)
+        self._put(key, blob)
+
+    def _key(self, *args):
+        return hashlib.sha256(repr((CACHE_VERSION, normalize_search_params(*args))).encode()).hexdigest()
+
+    def _put(self, key, blob):
+        with self._lock:
+            if key in self._mem: return
+            self._mem[key] = blob
+            self._mem_bytes += len(blob)
+            while self._mem_bytes > self.max_bytes and len(self._mem) > 1:
+                _, old = self._mem.popitem(last=False)
+                self._mem_bytes -= len(old)
+
+    def _read_disk(self, key):
+        if not self.disk_dir: return None
+        try:
+            path = os.path.join(self.disk_dir, key + ".pkl")
+            with open(path, "rb") as f:
+                blob = f.read()
+            os.utime(path)  # 최근 사용 표시
+            return blob
+        except OSError:
+            return None
+
+    def _write_disk(self, key, blob):
+        if not self.disk_dir: return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, os.path.join(self.disk_dir, key + ".pkl"))
+        except OSError:
+            return
+        with self._lock:
+            due = self._disk_written is None or self._disk_written + len(blob) >= self.disk_max_bytes // 8
+            self._disk_written = 0 if due else self._disk_written + len(blob)
+        if due: self._trim_disk()
+
+    def _trim_disk(self):
+        files = []
+        try:
+            with os.scandir(self.disk_dir) as it:
+                for e in it:
+                    if not e.name.endswith(".pkl"): continue
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    files.append((st.st_mtime, st.st_size, e.path))
+        except OSError:
+            return
+        total = sum(f[1] for f in files)
+        if total <= self.disk_max_bytes: return
+        evicted = 0
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes * 0.9: break
+            try:
+                os.remove(path)
+            except OSError:
+                continue  # 다른 프로세스가 먼저 지움
+            total -= size
+            evicted += 1
+        with self._lock: self.disk_evicted += evicted
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                'entries': len(self._mem), 'bytes': self._mem_bytes, 'disk_evicted': self.disk_evicted,
+            }
@@ -0,0 +1,177 @@
+import json
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# 후보 1개의 박스 위치를 한 번만 계산 (그림 / PDF / 팔레타이저 출력 공용, plotly 없음)
+# 배치 = (n, 8) float 배열, 열 순서는 FIELDS: (x, y, z) 는 왼쪽 아래 모서리, rot 1 = opt_orient 에서 90도 회전
+# 층 순서 (아래층부터), 층 안에서는 패턴이 만든 순서
+
+FIELDS = ('x', 'y', 'z', 'dx', 'dy', 'dz', 'layer', 'rot')
+X, Y, Z, DX, DY, DZ, LAYER, ROT = range(8)
+
+# ==========================================
+# 1. 층 배치 (x, y, dx, dy, rot)
+# ==========================================
+def _rects(xs, ys, dx, dy, L):
+    out = np.empty((len(xs), 5))
+    out[:, 0], out[:, 1], out[:, 2], out[:, 3] = xs, ys, dx, dy
+    out[:, 4] = (out[:, 2] != L)
+    return out
+
+def grid_rects(nc, nr, bl, bw, pl_L, pl_W, L):
+    # 파레트 가운데에 nc x nr (행 우선)
+    rr, cc = np.meshgrid(np.arange(nr), np.arange(nc), indexing='ij')
+    return _rects((pl_L - nc * bl) / 2 + cc.ravel() * bl, (pl_W - nr * bw) / 2 + rr.ravel() * bw, bl, bw, L)
+
+def pinwheel_rects(L, W, k, pl_L, pl_W):
+    # 네 변을 돌아가며 k 줄씩 (가운데 빈칸), 박스 순서는 줄마다 아래 -> 오른쪽 -> 위 -> 왼쪽
+    span = L + k * W
+    off_x, off_y = (pl_L - span) / 2, (pl_W - span) / 2
+    i = np.arange(k)
+    xs = np.column_stack([np.full(k, off_x), off_x + L + i * W, np.full(k, off_x + k * W), off_x + i * W]).ravel()
+    ys = np.column_stack([off_y + i * W, np.full(k, off_y), off_y + L + i * W, np.full(k, off_y + k * W)]).ravel()
+    dx = np.tile([L, W, L, W], k)
+    dy = np.tile([W, L, W, L], k)
+    return _rects(xs, ys, dx, dy, L)
+
+def block_rects(res, pl_L, pl_W):
+    # block 패턴: 엔진이 준 한 층 배치를 파레트 가운데로
+    rects = np.array(res['placements'], dtype=float).reshape(-1, 4)
+    span_x = (rects[:, 0] + rects[:, 2]).max()
+    span_y = (rects[:, 1] + rects[:, 3]).max()
+    return _rects(rects[:, 0] + (pl_L - span_x) / 2, rects[:, 1] + (pl_W - span_y) / 2,
+                  rects[:, 2], rects[:, 3], res['opt_orient'][0])
+
+def layer_rects(res, pl_L, pl_W):
+    # (짝수 층, 홀수 층): 평면 배치는 층마다 이 둘의 반복
+    L, W = res['opt_orient']
+    if res['pattern_type'] == 'pinwheel':
+        even = pinwheel_rects(L, W, res['pinwheel_k'], pl_L, pl_W)
+        # 홀수 층은 대각선 대칭 (x <-> y)
+        odd = even[:, [1, 0, 3, 2, 4]]
+        odd[:, 4] = (odd[:, 2] != L)
+    elif res['pattern_type'] == 'block':
+        # 홀수 층은 좌우 반전 (비대칭 배치면 위아래 층이 엇갈림)
+        even = block_rects(res, pl_L, pl_W)
+        odd = even.copy()
+        odd[:, 0] = pl_L - even[:, 0] - even[:, 2]
+    else:
+        nc, nr = res['pattern_dims']
+        even = grid_rects(nc, nr, L, W, pl_L, pl_W, L)
+        odd = grid_rects(nr, nc, W, L, pl_L, pl_W, L) if 'rot' in res['interlock_desc_key'] else even
+    return even, odd
+
+# ==========================================
+# 2. 전체 배치 (n, 8)
+# ==========================================
+def stack_layers(even, odd, layers, H):
+    # 층 i = even/odd 번갈아, z = i * H
+    n_even, n_odd = (layers + 1) // 2, layers // 2
+    sizes = np.where(np.arange(layers) % 2 == 0, len(even), len(odd))
+    out = np.empty((int(sizes.sum()), 8))
+    layer = np.repeat(np.arange(layers), sizes)
+    out[:, LAYER] = layer
+    out[:, Z] = layer * H
+    out[:, DZ] = H
+    # 짝수 층끼리 / 홀수 층끼리 한 번에 채움
+    sel = (layer % 2 == 0)
+    cols = [X, Y, DX, DY, ROT]
+    if n_even: out[np.ix_(sel, cols)] = np.tile(even, (n_even, 1))
+    if n_odd: out[np.ix_(~sel, cols)] = np.tile(odd, (n_odd, 1))
+    return out
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+CACHE_SIZE = 64
+
+def _cached(key, build):
+    # 후보 fingerprint 기준 (그림 여러 개 + PDF + 출력이 같은 배열을 봄), 읽기 전용으로 돌려줌
+    if key is None: return build()
+    with _cache_lock:
+        arr = _cache.get(key)
+        if arr is not None:
+            _cache.move_to_end(key)
+            return arr
+    arr = build()
+    arr.setflags(write=False)
+    with _cache_lock:
+        _cache[key] = arr
+        while len(_cache) > CACHE_SIZE: _cache.popitem(last=False)
+    return arr
+
+def _key(kind, res, *extra):
+    return (kind, res.fingerprint()) + extra if hasattr(res, 'fingerprint') else None
+
+def pallet_placements(res, pl_L, pl_W):
+    # 파레트 위 박스 전체
+    def build():
+        even, odd = layer_rects(res, pl_L, pl_W)
+        return stack_layers(even, odd, res['p_layers'], res['box_outer'][2])
+    return _cached(_key('pallet', res, pl_L, pl_W), build)
+
+def product_placements(res):
+    # 박스 안 제품 전체 (박스 안쪽 기준, 모든 층 같은 방향)
+    def build():
+        p_d1, p_d2, p_d3, n_c, n_r, n_l = res['prod_detail']
+        kk, jj, ii = np.meshgrid(np.arange(n_l), np.arange(n_r), np.arange(n_c), indexing='ij')
+        out = np.zeros((ii.size, 8))
+        out[:, X], out[:, Y], out[:, Z] = ii.ravel() * p_d1, jj.ravel() * p_d2, kk.ravel() * p_d3
+        out[:, DX], out[:, DY], out[:, DZ] = p_d1, p_d2, p_d3
+        out[:, LAYER] = kk.ravel()
+        return out
+    return _cached(_key('product', res), build)
+
+def layer_of(placements, layer):
+    return placements[placements[:, LAYER] == layer]
+
+# ==========================================
+# 3. 팔레타이저 / PLC 출력 (CSV, JSON)
+# ==========================================
+# 한 줄 = 박스 1개 (놓는 순서), 좌표는 mm (0.1 단위, 정수면 소수점 없이), cx/cy/cz = 박스 중심
+EXPORT_FIELDS = ('seq', 'layer', 'x', 'y', 'z', 'dx', 'dy', 'dz', 'rot', 'cx', 'cy', 'cz')
+EXPORT_CHUNK = 4096
+
+def _num(v):
+    # 숫자 열 -> 바이트 문자열 열
+    t = np.rint(np.asarray(v, dtype=float) * 10).astype(np.int64)
+    s = (np.abs(t) // 10).astype('S12')
+    frac = (t % 10 != 0)
+    if frac.any(): s = np.where(frac, np.char.add(np.char.add(s, b'.'), (np.abs(t) % 10).astype('S1')), s)
+    if (t < 0).any(): s = np.where(t < 0, np.char.add(b'-', s), s)
+    return s
+
+def _text_rows(p, start, head, sep, tail):
+    # 박스 chunk 개를 (머리, 값, 구분자, 값, ..., 꼬리) 고정폭 바이트 표로 채운 뒤 NUL 채움만 지움 (박스별 파이썬 객체 없음)
+    cols = [np.arange(start, start + len(p)), p[:, LAYER], p[:, X], p[:, Y], p[:, Z], p[:, DX], p[:, DY], p[:, DZ], p[:, ROT],
+            p[:, X] + p[:, DX] / 2, p[:, Y] + p[:, DY] / 2, p[:, Z] + p[:, DZ] / 2]
+    table = np.empty((len(p), 2 * len(cols) + 1), dtype='S12')
+    table[:, 0] = head
+    table[:, 1::2] = np.column_stack([_num(c) for c in cols])
+    table[:, 2:-1:2] = sep
+    table[:, -1] = tail
+    return table
+
+def _text(table):
+    buf = table.view(np.uint8).ravel()
+    return buf[buf != 0].tobytes().decode('ascii')
+
+def iter_export(res, pallet_dims, fmt='csv', chunk=EXPORT_CHUNK):
+    # 문자열 조각을 차례로 (파일 / HTTP 응답에 바로 씀), 박스 수천 개도 chunk 개씩만 메모리에
+    p = pallet_placements(res, pallet_dims[0], pallet_dims[1])
+    if fmt == 'csv':
+        yield ",".join(EXPORT_FIELDS) + "\n"
+        for i in range(0, len(p), chunk):
+            yield _text(_text_rows(p[i:i + chunk], i + 1, b'', b',', b'\n'))
+        return
+    head = {'pallet': list(pallet_dims[:3]), 'box': list(res['box_outer']), 'pattern': res['pattern_type'],
+            'layers': res['p_layers'], 'count': len(p), 'fields': list(EXPORT_FIELDS)}
+    yield json.dumps(head)[:-1] + ', "boxes": ['
+    for i in range(0, len(p), chunk):
+        table = _text_rows(p[i:i + chunk], i + 1, b',\n[', b',', b']')
+        if i == 0: table[0, 0] = b'\n['
+        yield _text(table)
+    yield "\n]}\n"
+
+def write_export(f, res, pallet_dims, fmt='csv'):
+    for part in iter_export(res, pallet_dims, fmt): f.write(part)
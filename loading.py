@@ -0,0 +1,103 @@
+from collections import OrderedDict
+
+# 파레트 결과(후보) -> 컨테이너/트럭 적재 (후보 12개를 차량당 입수로 다시 순위)
+# 바닥은 두 방향 섞기 중 최대: 길이 방향으로 행을 나누거나 (rows), 폭 방향으로 줄을 나누거나 (lanes)
+#   세로 = 긴 변이 차량 길이 방향, 가로 = 짧은 변이 차량 길이 방향 (EUR 1200x800 40ft = 25개)
+# 높이는 단 수(tiers), 무게는 적재 중량(payload), 단적재는 아래 박스 SF >= SAFE_SF 일 때만
+
+# 내측 치수 (L, W, H mm), 적재 중량 (kg)
+VEHICLES = OrderedDict([
+    ("20ft", {'dims': (5898, 2352, 2393), 'payload': 28200}),
+    ("40ft", {'dims': (12032, 2352, 2393), 'payload': 26700}),
+    ("40HC", {'dims': (12032, 2352, 2698), 'payload': 26500}),
+    ("Truck 5t", {'dims': (6200, 2350, 2300), 'payload': 5000}),
+    ("Truck 11t", {'dims': (9100, 2350, 2500), 'payload': 11000}),
+    ("Trailer 13.6m", {'dims': (13600, 2450, 2700), 'payload': 24000}),
+])
+PALLET_DECK_H = 150   # 파레트 자체 높이 (mm)
+PALLET_TARE_KG = 25   # 파레트 자체 무게 (kg)
+SAFE_SF = 3.0         # 엔진의 unsafe 기준과 같음
+MAX_PALLET_TIERS = 2  # 파레트 단적재 상한
+
+# ==========================================
+# 1. 바닥 배치
+# ==========================================
+def floor_slots(veh_L, veh_W, l, w):
+    # (개수, (방식, 세로 행/줄 수, 가로 행/줄 수)), l >= w
+    best = (0, ('rows', 0, 0))
+    # rows: 가로 행 a 개 (한 행에 veh_W // l 개) + 남은 길이에 세로 행 (한 행에 veh_W // w 개)
+    n_long, n_cross = int(veh_W // w) if l <= veh_L else 0, int(veh_W // l)
+    for a in range(int(veh_L // w) + 1 if n_cross else 1):
+        b = int((veh_L - a * w) // l) if n_long else 0
+        n = a * n_cross + b * n_long
+        if n > best[0]: best = (n, ('rows', b, a))
+    # lanes: 가로 줄 a 개 (폭 l, 한 줄에 veh_L // w 개) + 남은 폭에 세로 줄 (폭 w, 한 줄에 veh_L // l 개)
+    per_cross, per_long = int(veh_L // w), int(veh_L // l)
+    for a in range(int(veh_W // l) + 1):
+        b = int((veh_W - a * l) // w)
+        n = a * per_cross + b * per_long
+        if n > best[0]: best = (n, ('lanes', b, a))
+    return best
+
+# ==========================================
+# 2. 적재 단위별 계산
+# ==========================================
+def _limit(slots, tiers, fit_tiers, payload, unit_kg):
+    # (적재 수, 제한 원인): height = 한 단도 안 들어감, stack = 강도 때문에 단 수를 줄임, payload = 중량 초과
+    units = slots * tiers
+    limit = 'height' if fit_tiers < 1 else 'stack' if tiers < fit_tiers else 'floor'
+    if unit_kg > 0 and payload // unit_kg < units:
+        units, limit = int(payload // unit_kg), 'payload'
+    return units, limit
+
+def load_pallets(cand, vehicle, deck_h=PALLET_DECK_H, tare_kg=PALLET_TARE_KG, max_tiers=MAX_PALLET_TIERS):
+    veh_L, veh_W, veh_H = vehicle['dims']
+    pl_L, pl_W = cand.pallet_dims[0], cand.pallet_dims[1]
+    load_L, load_W, load_H = cand.load_dims
+    # 적재물이 파레트보다 크면 적재물 기준
+    unit_L, unit_W = max(pl_L, load_L), max(pl_W, load_W)
+    unit_H = load_H + deck_h
+    unit_kg = cand.total_boxes * cand.weight + tare_kg
+
+    slots, layout = floor_slots(veh_L, veh_W, max(unit_L, unit_W), min(unit_L, unit_W))
+    fit_tiers = min(int(veh_H // unit_H), max(1, max_tiers))
+    # 윗 파레트 무게는 아래 파레트 맨 아래층 박스들이 나눠 받음 (BCT 없으면 단적재 안 함)
+    strength = cand.strength
+    per_box_kg = unit_kg / cand.yield_per_layer
+    tiers = fit_tiers
+    while tiers > 1 and not (strength.bct and strength.bct / (strength.load + per_box_kg * (tiers - 1)) >= SAFE_SF):
+        tiers -= 1
+    units, limit = _limit(slots, tiers, fit_tiers, vehicle['payload'], unit_kg)
+    return {'mode': 'pallet', 'units': units, 'slots': slots, 'tiers': tiers, 'layout': layout,
+            'unit_dims': (unit_L, unit_W, unit_H), 'unit_kg': unit_kg, 'limit': limit,
+            'boxes': units * cand.total_boxes, 'products': units * cand.total, 'kg': units * unit_kg}
+
+def load_floor(cand, vehicle):
+    # 파레트 없이 박스를 바로 (세워서, 바닥에서 90도 회전만)
+    veh_L, veh_W, veh_H = vehicle['dims']
+    b_l, b_w, b_h = cand.box_outer
+    box_kg = cand.weight
+    slots, layout = floor_slots(veh_L, veh_W, max(b_l, b_w), min(b_l, b_w))
+    fit_tiers = int(veh_H // b_h)
+    # 맨 아래 박스: (단 - 1) 개의 무게를 SAFE_SF 로 버텨야 함 (BCT 없으면 높이만)
+    bct = cand.strength.bct
+    tiers = min(fit_tiers, int(bct / (SAFE_SF * box_kg)) + 1) if bct and box_kg > 0 else fit_tiers
+    units, limit = _limit(slots, tiers, fit_tiers, vehicle['payload'], box_kg)
+    return {'mode': 'floor', 'units': units, 'slots': slots, 'tiers': tiers, 'layout': layout,
+            'unit_dims': tuple(cand.box_outer), 'unit_kg': box_kg, 'limit': limit,
+            'boxes': units, 'products': units * cand.qty, 'kg': units * box_kg}
+
+# ==========================================
+# 3. 후보 순위 (차량당 제품 수)
+# ==========================================
+def rank_candidates(candidates, vehicle_name, mode='pallet', **kw):
+    # [(원래 순위 0.., 결과)] 제품 수 내림차순, 동률은 원래 순위
+    vehicle = VEHICLES[vehicle_name]
+    loads = [(i, load_pallets(c, vehicle, **kw) if mode == 'pallet' else load_floor(c, vehicle))
+             for i, c in enumerate(candidates)]
+    return sorted(loads, key=lambda x: (-x[1]['products'], x[0]))
+
+def load_all(cand, mode='pallet', names=None, **kw):
+    # 후보 1개를 차량마다
+    return [(name, load_pallets(cand, VEHICLES[name], **kw) if mode == 'pallet' else load_floor(cand, VEHICLES[name]))
+            for name in names or VEHICLES]
@@ -0,0 +1,286 @@
+import os
+import threading
+import numpy as np
+from fpdf import FPDF, FPDF_VERSION
+from engine import fmt
+from geometry import DX, DY, DZ, LAYER, X, Y, Z, layer_of, pallet_placements, product_placements
+from translations import TRANSLATIONS
+
+# PDF 보고서 생성 (app 에서 보고서를 요청할 때만 임포트)
+# 배치 그림은 geometry 배열을 FPDF 벡터 (사각형 / 다각형 / 글자) 로 바로 그림: kaleido / 헤드리스 브라우저 없음
+
+# ==========================================
+# 1. 글꼴 (파싱 1회)
+# ==========================================
+KOREAN_FONTS = ["NanumGothic.ttf", "Malgun.ttf", "AppleGothic.ttf"]
+LEGACY_FPDF = FPDF_VERSION.startswith("1.")
+
+class ReportRenderer:
+    # 보고서마다 다시 하지 않을 것: 한글 TTF 파싱 결과 (pyfpdf 1.7)
+    def __init__(self):
+        self._fonts = {}
+        self._font_path = None
+        self._lock = threading.Lock()
+
+    def warm(self):
+        # 첫 보고서 전에 한글 글꼴을 미리 파싱 (비동기, 글꼴이 없으면 할 일 없음)
+        font_path = self.korean_font()
+        if font_path and LEGACY_FPDF:
+            threading.Thread(target=self.add_font, args=(FPDF(), 'KoreanFont', font_path), daemon=True).start()
+
+    def korean_font(self):
+        with self._lock:
+            if self._font_path is None:
+                self._font_path = next((f for f in KOREAN_FONTS if os.path.exists(f)), "")
+            return self._font_path or None
+
+    def add_font(self, pdf, family, font_path, style=''):
+        key = family.lower() + style
+        with self._lock:
+            cached = self._fonts.get((key, font_path))
+        if cached is None or not LEGACY_FPDF:
+            pdf.add_font(family, style, font_path, uni=True)
+            entry = pdf.fonts.get(key)
+            if LEGACY_FPDF and entry is not None and 'subset' in entry:
+                files = {k: dict(pdf.font_files[k]) for k in (key, font_path) if k in pdf.font_files}
+                with self._lock:
+                    self._fonts[(key, font_path)] = (dict(entry), files)
+            return
+        # 파싱된 글꼴 정보(cw 등)는 공유, 문서별 상태(i, subset, n)만 새로
+        entry, files = cached
+        font = dict(entry)
+        font['i'] = len(pdf.fonts) + 1
+        font['subset'] = list(entry['subset'])
+        font.pop('n', None)
+        pdf.fonts[key] = font
+        for k, v in files.items(): pdf.font_files[k] = dict(v)
+
+_default_renderer = None
+_default_renderer_lock = threading.Lock()
+
+def get_default_renderer():
+    global _default_renderer
+    with _default_renderer_lock:
+        if _default_renderer is None: _default_renderer = ReportRenderer()
+        return _default_renderer
+
+# ==========================================
+# 2. 배치 그림 (FPDF 벡터)
+# ==========================================
+SLOT_W, SLOT_H = 90, 63          # 그림 1칸 (mm)
+ISO_C, ISO_S = 0.8660254, 0.5    # cos 30, sin 30
+PLAN_LABEL_MAX = 400             # 이보다 박스가 많으면 번호 생략
+
+def _rgb(hex_color, shade=1.0):
+    h = hex_color.lstrip('#')
+    return tuple(int(int(h[i:i + 2], 16) * shade) for i in (0, 2, 4))
+
+def _fit(x0, y0, x1, y1, x, y, w, h, pad=3):
+    # 도면 좌표 범위 -> 칸 (배율, 원점): 비율 유지, 가운데 정렬
+    s = min((w - 2 * pad) / max(x1 - x0, 1e-9), (h - 2 * pad) / max(y1 - y0, 1e-9))
+    return s, x + (w - (x1 - x0) * s) / 2 - x0 * s, y + (h - (y1 - y0) * s) / 2 - y0 * s
+
+def draw_plan(pdf, x, y, w, h, outer, rects, fill, line):
+    # 위에서 본 한 층: outer = (L, W) 테두리, rects = (n, 4) (x, y, dx, dy), 도면 y 는 위쪽이 +
+    L, W = outer
+    x0, x1 = min(0, rects[:, 0].min()), max(L, (rects[:, 0] + rects[:, 2]).max())
+    y0, y1 = min(0, rects[:, 1].min()), max(W, (rects[:, 1] + rects[:, 3]).max())
+    s, ox, oy = _fit(x0, -y1, x1, -y0, x, y, w, h)
+    pdf.set_line_width(0.2)
+    pdf.set_draw_color(*_rgb(line))
+    pdf.set_fill_color(*_rgb(fill))
+    for bx, by, bdx, bdy in rects.tolist():
+        pdf.rect(ox + bx * s, oy - (by + bdy) * s, bdx * s, bdy * s, 'DF')
+    pdf.set_draw_color(0, 0, 0)
+    pdf.set_line_width(0.6)
+    pdf.rect(ox, oy - W * s, L * s, W * s)
+
+    # 번호: 가장 작은 칸에 두 자리가 들어갈 때만
+    cell = (np.minimum(rects[:, 2], rects[:, 3]) * s).min()
+    if len(rects) > PLAN_LABEL_MAX or cell < 3: return
+    size = min(8, cell * 2)
+    pdf.set_font('Arial', '', size)
+    pdf.set_text_color(0, 0, 0)
+    for i, (bx, by, bdx, bdy) in enumerate(rects.tolist()):
+        label = str(i + 1)
+        pdf.text(ox + (bx + bdx / 2) * s - pdf.get_string_width(label) / 2, oy - (by + bdy / 2) * s + size * 0.12, label)
+
+def _iso(x, y, z):
+    # 보는 방향 (+x, +y, +z) -> 오른쪽 = +y, 페이지 아래 = +
+    return (y - x) * ISO_C, (x + y) * ISO_S - z
+
+def iso_faces(boxes):
+    # (n, 6) 박스 -> 보이는 면 3개 (위, +x, +y) 의 꼭짓점 (n, 3, 4, 2)
+    x, y, z, dx, dy, dz = boxes.T
+    x1, y1, z1 = x + dx, y + dy, z + dz
+    faces = (((x, y, z1), (x1, y, z1), (x1, y1, z1), (x, y1, z1)),
+             ((x1, y, z), (x1, y1, z), (x1, y1, z1), (x1, y, z1)),
+             ((x, y1, z), (x1, y1, z), (x1, y1, z1), (x, y1, z1)))
+    return np.array([[_iso(*c) for c in face] for face in faces]).transpose(3, 0, 1, 2)
+
+def iso_order(p):
+    # 그릴 박스 (먼 것부터): 아래층부터, 층 안에서는 중심 x + y 순
+    # 빈틈 없는 층의 안쪽 박스는 바로 위층도 빈틈 없이 덮으면 생략 (위 / 옆 면이 모두 가려짐)
+    layer = p[:, LAYER].astype(np.int64)
+    xe, ye = p[:, X] + p[:, DX], p[:, Y] + p[:, DY]
+    keep = np.ones(len(p), dtype=bool)
+    boxes = []
+    for l in range(int(layer.max()) + 1):
+        sel = (layer == l)
+        bbox = (p[sel, X].min(), p[sel, Y].min(), xe[sel].max(), ye[sel].max())
+        area = (p[sel, DX] * p[sel, DY]).sum()
+        full = abs(area - (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])) <= 1e-6 * area
+        boxes.append((sel, bbox, full))
+    for (sel, bbox, full), (_, up, up_full) in zip(boxes, boxes[1:]):
+        if not (full and up_full): continue
+        hidden = (sel & (xe < bbox[2] - 1e-6) & (ye < bbox[3] - 1e-6)
+                  & (p[:, X] >= up[0]) & (p[:, Y] >= up[1]) & (xe <= up[2]) & (ye <= up[3]))
+        keep &= ~hidden
+    idx = np.nonzero(keep)[0]
+    return idx[np.lexsort((xe[idx] + p[idx, X] + ye[idx] + p[idx, Y], layer[idx]))]
+
+def draw_iso(pdf, x, y, w, h, p, colors, base):
+    # p = 배치 (n, 8), colors = (짝수 층, 홀수 층), base = (L, W) 바닥판
+    # 면마다 PDF 경로 연산자를 직접 씀 (q ... Q 로 감싸서 FPDF 의 색 상태는 그대로)
+    idx = iso_order(p)
+    faces = iso_faces(p[idx][:, [X, Y, Z, DX, DY, DZ]])
+    L, W = base
+    deck = np.array([_iso(*c) for c in ((0, 0, 0), (L, 0, 0), (L, W, 0), (0, W, 0))])
+    pts = np.vstack([faces.reshape(-1, 2), deck])
+    s, ox, oy = _fit(*pts.min(axis=0), *pts.max(axis=0), x, y, w, h)
+
+    k, page_h = pdf.k, pdf.h
+    def to_pdf(a):
+        out = np.empty_like(a)
+        out[..., 0] = (ox + a[..., 0] * s) * k
+        out[..., 1] = (page_h - (oy + a[..., 1] * s)) * k
+        return out
+    def path(quad, fill):
+        (a, b), (c, d), (e, f), (g, i) = quad
+        return f"{fill} {a:.2f} {b:.2f} m {c:.2f} {d:.2f} l {e:.2f} {f:.2f} l {g:.2f} {i:.2f} l h B"
+
+    # 위 / +x / +y 면 밝기
+    shades = [[" ".join(f"{v / 255:.3f}" for v in _rgb(c, shade)) + " rg" for shade in (1.0, 0.8, 0.62)] for c in colors]
+    ops = ["q", f"{0.1 * k:.2f} w", "0.2 0.2 0.2 RG", path(to_pdf(deck).tolist(), "0.85 0.85 0.85 rg")]
+    for quads, parity in zip(to_pdf(faces).tolist(), (p[idx, LAYER].astype(np.int64) % 2).tolist()):
+        for quad, fill in zip(quads, shades[parity]):
+            ops.append(path(quad, fill))
+    ops.append("Q")
+    pdf._out("\n".join(ops))
+
+def layout_drawers(res, pallet_dims):
+    # 보고서의 배치 그림 4개 (파레트 2D, 파레트 3D, 박스 안 2D, 박스 안 3D)
+    pl_L, pl_W = pallet_dims[0], pallet_dims[1]
+    pallet = pallet_placements(res, pl_L, pl_W)
+    prods = product_placements(res)
+    in_L, in_W, _ = res['box_inner']
+    return [
+        lambda pdf, x, y, w, h: draw_plan(pdf, x, y, w, h, (pl_L, pl_W), layer_of(pallet, 0)[:, [X, Y, DX, DY]], "#85C1E9", "#0000FF"),
+        lambda pdf, x, y, w, h: draw_iso(pdf, x, y, w, h, pallet, ('#355C7D', '#C06C84'), (pl_L, pl_W)),
+        lambda pdf, x, y, w, h: draw_plan(pdf, x, y, w, h, (in_L, in_W), layer_of(prods, 0)[:, [X, Y, DX, DY]], "#F9E79F", "#FFA500"),
+        lambda pdf, x, y, w, h: draw_iso(pdf, x, y, w, h, prods, ('#F5B7B1', '#D2B4DE'), (in_L, in_W)),
+    ]
+
+# ==========================================
+# 3. PDF 보고서
+# ==========================================
+class PDFWithFooter(FPDF):
+    def footer(self):
+        self.set_y(-15)
+        try:
+            self.set_font('KoreanFont', '', 8)
+        except:
+            self.set_font("Arial", "I", 8)
+        self.cell(0, 10, "Generated by Sparkpetkorea Co., LTD", 0, 0, 'C')
+
+def pdf_bytes_of(pdf):
+    out = pdf.output(dest='S')
+    if isinstance(out, str): out = out.encode('latin-1')
+    return bytes(out)
+
+def create_pdf_report(res, p_dims_input, pallet_dims, weight_val, lang_code, renderer=None):
+    t = TRANSLATIONS[lang_code]
+    renderer = renderer or get_default_renderer()
+    pdf = PDFWithFooter()
+    pdf.add_page()
+    
+    font_path = renderer.korean_font()
+            
+    use_korean = False
+    if font_path and lang_code == "🇰🇷":
+        renderer.add_font(pdf, 'KoreanFont', font_path)
+        renderer.add_font(pdf, 'KoreanFont', font_path, 'B')  # 굵은 제목용 (같은 TTF)
+        use_korean = True
+        pdf.set_font('KoreanFont', '', 10)
+    else:
+        pdf.set_font("Arial", '', 10)
+        if lang_code == "🇰🇷":
+            t = TRANSLATIONS["🇺🇸"]
+
+    def cell_kv(k, v):
+        if use_korean: pdf.set_font('KoreanFont', '', 10)
+        else: pdf.set_font('Arial', '', 10)
+        pdf.cell(50, 8, str(k), border=1)
+        pdf.cell(140, 8, str(v), border=1, ln=True)
+
+    if use_korean: pdf.set_font('KoreanFont', 'B', 16)
+    else: pdf.set_font('Arial', 'B', 16)
+    
+    pdf.cell(200, 10, txt=t['pdf_title'], ln=True, align='C')
+    pdf.ln(10)
+    
+    if use_korean: pdf.set_font('KoreanFont', 'B', 12)
+    else: pdf.set_font('Arial', 'B', 12)
+    pdf.cell(200, 10, txt=t['pdf_summary'], ln=True)
+    
+    p_l, p_w, p_h = p_dims_input
+    used_dims = res.get('prod_dims_used', p_dims_input)
+    b_l, b_w, b_h = res['box_outer']
+    l_l, l_w, l_h = res['load_dims']
+    
+    cell_kv(t['l_prod_in'], f"{fmt(p_l)} x {fmt(p_w)} x {fmt(p_h)} mm ({fmt(weight_val)}g)")
+    cell_kv(t['l_prod_act'], f"{fmt(used_dims[0])} x {fmt(used_dims[1])} x {fmt(used_dims[2])} mm")
+    cell_kv(t['l_box'], f"{fmt(b_l)} x {fmt(b_w)} x {fmt(b_h)} mm")
+    cell_kv(t['l_load'], f"{fmt(l_l)} x {fmt(l_w)} x {fmt(l_h)} mm")
+    pdf.ln(5)
+    
+    if use_korean: pdf.set_font('KoreanFont', 'B', 12)
+    else: pdf.set_font('Arial', 'B', 12)
+    pdf.cell(200, 10, txt=t['pdf_perf'], ln=True)
+    
+    pat_name = t[res['interlock_desc_key']]
+    if res.get('pinwheel_k', 0) > 1: pat_name += f" ({res['pinwheel_k']}-Layer)"
+    
+    cell_kv("Pattern", pat_name)
+    cell_kv("Quantity", f"{res['qty']} {t['qty_unit'].split('/')[0]} / Total: {fmt(res['total'])}")
+    cell_kv("Efficiency", f"{res['efficiency']:.1f}%")
+    cell_kv("Total Boxes", f"{res['total_boxes']} boxes")
+    cell_kv("Layers", f"{res['p_layers']}")
+    cell_kv("Safety Factor", f"{res['strength']['sf']:.2f}")
+    cell_kv("Box BCT", f"{fmt(res['strength']['bct'])} kgf")
+    pdf.ln(5)
+
+    if use_korean: pdf.set_font('KoreanFont', 'B', 12)
+    else: pdf.set_font('Arial', 'B', 12)
+    pdf.cell(200, 10, txt=t['pdf_vis'], ln=True)
+    
+    try:
+        y_pos = pdf.get_y()
+        for i, draw in enumerate(layout_drawers(res, pallet_dims)):
+            x_pos = 10 if i % 2 == 0 else 110
+            if i % 2 == 0 and i > 0: 
+                y_pos += 70
+                if y_pos > 240: 
+                    pdf.add_page()
+                    y_pos = 20
+            try:
+                draw(pdf, x_pos, y_pos, SLOT_W, SLOT_H)
+            except Exception as e:
+                pdf.set_xy(x_pos, y_pos)
+                pdf.set_font('Arial', '', 8)
+                pdf.cell(SLOT_W, 10, f"[Drawing Error: {type(e).__name__}]", border=1)
+    except Exception as e:
+        pdf.ln(5)
+        pdf.cell(200, 10, txt=f"Vis Error: {str(e)}", ln=True)
+
+    return pdf_bytes_of(pdf), (not use_korean and lang_code=="🇰🇷")
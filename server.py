@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import statistics
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlsplit
+
+# streamlit / plotly / kaleido 는 임포트하지 않음 (batch 와 같은 워커 사용)
+from engine import normalize_search_params, log_run
+from batch import DEFAULTS, _init_worker, merge_run, row_to_params, run_params, run_shard
+
+# python server.py serve --port 8080 --workers 4
+#   POST /v1/candidates  {"dims": "180,120,50", "weight": 5, "pallet": "1100,1100,1650", "top": 3, ...}
+#   GET  /v1/stats, GET /healthz
+# python server.py loadtest --url http://127.0.0.1:8080 --concurrency 32 --requests 2000
+#
+# 요청 키는 batch 입력 컬럼과 같음 (없으면 UI 기본값): dims, weight, box_type, min_qty, max_qty,
+# pallet, rotation, stack_limit, max_box_weight, min_layer_qty, max_layer_qty, single_item, top
+# "parallel": true 면 질의 1건을 워커 수만큼 샤드로 나눠 동시에 (NumPy 엔진, 박스 치수 해시로 칸을 나눔, 결과는 같음, 큰 질의용)
+
+MAX_BODY = 64 * 1024
+IDLE_TIMEOUT = 30
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+# ==========================================
+# 1. 서비스 (병합 + 대기열 제한)
+# ==========================================
+class SearchService:
+    # 같은 질의가 처리 중이면 그 결과를 함께 기다림, 처리 중인 고유 질의가 max_pending 이상이면 거절
+    def __init__(self, workers=None, max_pending=64, cache_dir=None, response_cache=1024):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.cache_dir = cache_dir
+        self.response_cache = response_cache
+        self._pool = self._new_pool()
+        self._inflight = {}
+        self._responses = OrderedDict()
+        self.counts = dict.fromkeys(('requests', 'computed', 'coalesced', 'cached', 'rejected', 'errors'), 0)
+        self.started = time.time()
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.cache_dir,))
+
+    def stats(self):
+        return dict(self.counts, pending=len(self._inflight), max_pending=self.max_pending,
+                    workers=self.workers, cached_responses=len(self._responses),
+                    uptime_s=round(time.time() - self.started, 1))
+
+    async def search(self, body):
+        # -> (status, payload dict)
+        self.counts['requests'] += 1
+        top_n = int(body.get('top') or 0)
+        parallel = str(body.get('parallel', '')).strip().lower() in ("1", "true", "y", "yes")
+        # 캐시 키와 실제 검색에 같은 값 (먼저 온 요청의 치수 순서가 결과를 정하지 않게)
+        params = normalize_search_params(*row_to_params(body))
+        key = (params, top_n)
+
+        cached = self._responses.get(key)
+        if cached is not None:
+            self._responses.move_to_end(key)
+            self.counts['cached'] += 1
+            return 200, dict(cached, source='cache')
+
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.counts['coalesced'] += 1
+            return 200, dict(await asyncio.shield(fut), source='coalesced')
+
+        if len(self._inflight) >= self.max_pending:
+            self.counts['rejected'] += 1
+            return 503, {'error': "server busy, retry later", 'pending': len(self._inflight)}
+
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._inflight[key] = fut
+        try:
+            try:
+                if parallel and self.workers > 1:
+                    t0 = time.perf_counter()
+                    parts = await asyncio.gather(*(loop.run_in_executor(self._pool, run_shard, params, (i, self.workers))
+                                                   for i in range(self.workers)))
+                    res = merge_run(parts, params, top_n, (time.perf_counter() - t0) * 1000)
+                else:
+                    res = await loop.run_in_executor(self._pool, run_params, params, top_n)
+            except BrokenProcessPool:
+                self._pool = self._new_pool()  # 워커가 죽으면 풀을 새로 띄우고 이번 요청은 실패 처리
+                raise
+            self.counts['computed'] += 1
+            log_run('api', ms=res['ms'], n=res['n'], search=res.pop('search', {}))
+            fut.set_result(res)
+            if self.response_cache:
+                self._responses[key] = res
+                while len(self._responses) > self.response_cache: self._responses.popitem(last=False)
+            return 200, dict(res, source='computed')
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # 기다리는 쪽이 없어도 경고가 나지 않게
+            raise
+        finally:
+            del self._inflight[key]
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+# ==========================================
+# 2. HTTP (표준 라이브러리 asyncio 스트림)
+# ==========================================
+async def read_request(reader):
+    line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+    if not line: return None
+    parts = line.decode('latin-1').split()
+    if len(parts) != 3: raise ValueError("bad request line")
+    method, target, version = parts
+    headers = {}
+    while True:
+        h = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+        if h in (b"\r\n", b"\n", b""): break
+        name, _, value = h.decode('latin-1').partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length') or 0)
+    if length > MAX_BODY: return method, target, version, headers, None
+    body = await asyncio.wait_for(reader.readexactly(length), IDLE_TIMEOUT) if length else b""
+    return method, target, version, headers, body
+
+def encode_response(status, payload, keep_alive, extra_headers=()):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    head.extend(extra_headers)
+    return ("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body
+
+async def dispatch(service, method, target, body):
+    path = urlsplit(target).path
+    if path == "/healthz":
+        return 200, {'status': 'ok'}
+    if path == "/v1/stats":
+        return 200, service.stats()
+    if path != "/v1/candidates":
+        return 404, {'error': f"no route {path}"}
+    if method != "POST":
+        return 405, {'error': "use POST with a JSON body"}
+    try:
+        req = json.loads(body or b"{}")
+        if not isinstance(req, dict): raise ValueError("body must be a JSON object")
+        return await service.search(req)
+    except (ValueError, TypeError, KeyError) as e:
+        service.counts['errors'] += 1
+        return 400, {'error': f"{type(e).__name__}: {e}"}
+
+async def handle_connection(service, reader, writer):
+    try:
+        while True:
+            try:
+                req = await read_request(reader)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                break
+            except ValueError as e:
+                writer.write(encode_response(400, {'error': str(e)}, False))
+                break
+            if req is None: break
+            method, target, version, headers, body = req
+            conn = headers.get('connection', '').lower()
+            keep_alive = conn != 'close' if version == "HTTP/1.1" else conn == 'keep-alive'
+            if body is None:
+                writer.write(encode_response(413, {'error': f"body over {MAX_BODY} bytes"}, False))
+                break
+            try:
+                status, payload = await dispatch(service, method, target, body)
+            except Exception as e:
+                service.counts['errors'] += 1
+                status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+            extra = ("Retry-After: 1",) if status == 503 else ()
+            writer.write(encode_response(status, payload, keep_alive, extra))
+            await writer.drain()
+            if not keep_alive: break
+    finally:
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+async def serve(host, port, workers, max_pending, cache_dir, response_cache, log=sys.stderr):
+    service = SearchService(workers, max_pending, cache_dir, response_cache)
+    server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), host, port,
+                                        backlog=max(128, max_pending * 2))
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows
+    addr = server.sockets[0].getsockname()
+    print(f"listening on http://{addr[0]}:{addr[1]} ({service.workers} workers, max {max_pending} pending)", file=log)
+    async with server:
+        await stop.wait()
+    service.close()
+
+# ==========================================
+# 3. 부하 테스트
+# ==========================================
+def loadtest_bodies(distinct):
+    # 서로 다른 질의 distinct 개를 돌아가며 보냄 (병합/캐시 효과 확인용)
+    bodies = []
+    for i in range(distinct):
+        d1, d2, d3 = 60 + (i * 37) % 240, 40 + (i * 23) % 160, 20 + (i * 11) % 120
+        bodies.append(json.dumps({'dims': f"{d1},{d2},{d3}", 'weight': DEFAULTS['weight'] + i % 7, 'top': 3}).encode())
+    return bodies
+
+async def _client(host, port, jobs, latencies, statuses):
+    reader = writer = None
+    while True:
+        try:
+            body = jobs.get_nowait()
+        except asyncio.QueueEmpty:
+            break
+        if writer is None:
+            reader, writer = await asyncio.open_connection(host, port)
+        req = (f"POST /v1/candidates HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+               f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+        t0 = time.perf_counter()
+        try:
+            writer.write(req)
+            await writer.drain()
+            status_line = await reader.readline()
+            status = int(status_line.split()[1])
+            length = 0
+            while True:
+                h = await reader.readline()
+                if h in (b"\r\n", b""): break
+                if h.lower().startswith(b"content-length:"): length = int(h.split(b":")[1])
+            await reader.readexactly(length)
+        except (ConnectionError, asyncio.IncompleteReadError, IndexError, ValueError):
+            status = 0
+            writer.close()
+            reader = writer = None
+        latencies.append((time.perf_counter() - t0) * 1000)
+        statuses[status] = statuses.get(status, 0) + 1
+    if writer is not None: writer.close()
+
+async def loadtest(url, concurrency, requests, distinct, log=sys.stderr):
+    u = urlsplit(url)
+    host, port = u.hostname or "127.0.0.1", u.port or 80
+    jobs = asyncio.Queue()
+    bodies = loadtest_bodies(distinct)
+    for i in range(requests): jobs.put_nowait(bodies[i % len(bodies)])
+    latencies, statuses = [], {}
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, jobs, latencies, statuses) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    lat = sorted(latencies)
+    pct = lambda p: lat[min(len(lat) - 1, int(p / 100 * len(lat)))] if lat else 0.0
+    report = {'requests': len(lat), 'seconds': round(elapsed, 3), 'rps': round(len(lat) / elapsed, 1) if elapsed else 0,
+              'status': {str(k): v for k, v in sorted(statuses.items())},
+              'latency_ms': {'p50': round(pct(50), 1), 'p95': round(pct(95), 1), 'p99': round(pct(99), 1),
+                             'max': round(lat[-1], 1) if lat else 0.0,
+                             'mean': round(statistics.mean(lat), 1) if lat else 0.0}}
+    print(json.dumps(report), file=log)
+    return report
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Local HTTP/JSON API for PalletLogic candidate search")
+    sub = ap.add_subparsers(dest="cmd")
+    sp = sub.add_parser("serve", help="run the API server (default)")
+    sp.add_argument("--host", default="127.0.0.1")
+    sp.add_argument("--port", type=int, default=8080)
+    sp.add_argument("--workers", type=int, default=None, help="search processes (default: all cores)")
+    sp.add_argument("--max-pending", type=int, default=64, help="distinct in-flight searches before answering 503")
+    sp.add_argument("--cache-dir", default=None, help="shared on-disk result cache directory")
+    sp.add_argument("--response-cache", type=int, default=1024, help="finished responses kept in memory (0 = off)")
+    lp = sub.add_parser("loadtest", help="hammer a running server and report latency percentiles")
+    lp.add_argument("--url", default="http://127.0.0.1:8080")
+    lp.add_argument("--concurrency", type=int, default=32)
+    lp.add_argument("--requests", type=int, default=1000)
+    lp.add_argument("--distinct", type=int, default=50, help="number of different queries in the mix")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "loadtest":
+        report = asyncio.run(loadtest(args.url, args.concurrency, args.requests, args.distinct))
+        return 0 if report['status'].get('200') == report['requests'] else 1
+    if args.cmd is None: args = sp.parse_args([])
+    asyncio.run(serve(args.host, args.port, args.workers, args.max_pending, args.cache_dir, args.response_cache))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
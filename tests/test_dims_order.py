@@ -0,0 +1,35 @@
+import itertools
+import random
+
+import pytest
+
+from engine import BOX_MARGINS, PalletLogic, ResultCache, normalize_search_params
+
+# 회전 허용이면 제품 치수 입력 순서와 무관하게 같은 후보 목록 (캐시 키는 정렬된 치수)
+
+def products():
+    rng = random.Random(7)
+    out = [[299, 69, 149]]
+    while len(out) < 30:
+        out.append([rng.choice([rng.randint(20, 300), round(rng.uniform(20, 300), 1)]) for _ in range(3)])
+    return out
+
+def params(dims, pallet=(1100, 1100, 1650), pareto=()):
+    return (list(dims), 300.0, 15000, 0, BOX_MARGINS[0], 1, 200, pallet, True, 6, 0, 0, False, pareto)
+
+@pytest.mark.parametrize("engine", ["find_candidates", "find_candidates_np"])
+@pytest.mark.parametrize("dims", products())
+def test_every_dims_order_gives_same_candidates(engine, dims):
+    ref = None
+    for perm in itertools.permutations(dims):
+        got = [c.to_dict() for c in getattr(PalletLogic(), engine)(*params(perm))]
+        if ref is None: ref = got
+        assert got == ref, perm
+
+def test_cached_result_matches_direct_search():
+    cache = ResultCache()
+    for perm in itertools.permutations([299, 69, 149]):
+        p = params(perm, pallet=(1200, 800, 1500))
+        direct = [c.to_dict() for c in PalletLogic().find_candidates_np(*p)]
+        assert [c.to_dict() for c in cache.find_candidates(PalletLogic(), *p)] == direct
+        assert normalize_search_params(*p)[0] == (69, 149, 299)
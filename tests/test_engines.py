@@ -0,0 +1,54 @@
+import pytest
+
+from engine import BOX_MARGINS, PalletLogic
+
+# NumPy 엔진 (find_candidates_np) 은 파이썬 엔진 (find_candidates) 과 같은 후보를 같은 순서로
+
+CASES = [
+    # dims, weight, box_type, min_qty, max_qty, pallet, rotation, min_layer_qty, max_layer_qty, pareto
+    ([180, 120, 50], 5.0, 0, 10, 100, (1100, 1100, 1650), True, 4, 0, ()),
+    ([180, 120, 50], 300.0, 1, 10, 100, (1200, 800, 1500), False, 4, 0, ()),
+    ([95.5, 70, 42], 40.0, 2, 1, 200, (1200, 1000, 1800), True, 0, 0, ()),
+    ([60, 40, 30], 5.0, 0, 10, 1000, (1100, 1100, 1650), True, 4, 12, ()),
+    ([100, 100, 60], 900.0, 0, 1, 50, (1219, 1016, 1500), True, 0, 0, ()),
+    ([210, 160, 90], 5.0, 0, 10, 200, (2400, 2000, 1800), True, 4, 0, ()),  # 테이블 없는 큰 파레트
+    ([180, 120, 50], 5.0, 0, 10, 100, (1100, 1100, 1650), True, 4, 0, ('total', 'sf', 'efficiency')),
+    ([60, 40, 30], 30.0, 1, 10, 500, (1200, 800, 1500), True, 0, 0, ('total', 'boxes')),
+]
+
+@pytest.mark.parametrize("top_k", [1, 12])
+@pytest.mark.parametrize("case", CASES)
+def test_numpy_engine_matches_python(case, top_k):
+    dims, weight, bt, min_qty, max_qty, pallet, rot, min_lq, max_lq, pareto = case
+    p = (dims, weight, 15000, bt, BOX_MARGINS[bt], min_qty, max_qty, pallet, rot, 6, min_lq, max_lq, False, pareto)
+    sim = PalletLogic()
+    ref = [c.to_dict() for c in sim.find_candidates(*p, top_k=top_k)]
+    assert ref
+    assert [c.to_dict() for c in sim.find_candidates_np(*p, top_k=top_k)] == ref
+    # 필터 값만 바뀐 두 번째 검색은 사전 후보 재사용 (_pre)
+    p2 = p[:5] + (min_qty + 5, max_qty - 5) + p[7:]
+    ref2 = [c.to_dict() for c in sim.find_candidates(*p2, top_k=top_k)]
+    assert [c.to_dict() for c in sim.find_candidates_np(*p2, top_k=top_k)] == ref2
+    assert sim.search_stats['precand'] == 'reuse'
+
+@pytest.mark.parametrize("stream_cells", [10 ** 9, 0])
+@pytest.mark.parametrize("case", [CASES[0], CASES[3], CASES[7]])
+def test_iter_candidates_np_matches_find_candidates_np(case, stream_cells, monkeypatch):
+    # stream_cells=0: 모든 질의를 샤드 조각으로 나눠 계산
+    monkeypatch.setattr(PalletLogic, 'NP_STREAM_CELLS', stream_cells)
+    dims, weight, bt, min_qty, max_qty, pallet, rot, min_lq, max_lq, pareto = case
+    p = (dims, weight, 15000, bt, BOX_MARGINS[bt], min_qty, max_qty, pallet, rot, 6, min_lq, max_lq, False, pareto)
+    steps = list(PalletLogic().iter_candidates_np(*p))
+    assert steps[-1][2] == 'done' and steps[-1][0] == 1.0
+    assert len(steps) == (1 if stream_cells else PalletLogic.NP_STREAM_SHARDS)
+    ref = [c.to_dict() for c in PalletLogic().find_candidates_np(*p)]
+    assert [c.to_dict() for c in steps[-1][1]] == ref
+
+def test_iter_candidates_np_stops_at_deadline(monkeypatch):
+    monkeypatch.setattr(PalletLogic, 'NP_STREAM_CELLS', 0)
+    dims, weight, bt, min_qty, max_qty, pallet, rot, min_lq, max_lq, pareto = CASES[3]
+    p = (dims, weight, 15000, bt, BOX_MARGINS[bt], min_qty, max_qty, pallet, rot, 6, min_lq, max_lq, False, pareto)
+    sim = PalletLogic()
+    progress, items, state = list(sim.iter_candidates_np(*p, deadline=0))[-1]
+    assert state == 'deadline' and items
+    assert progress == sim.search_stats['progress'] == 1 / PalletLogic.NP_STREAM_SHARDS
@@ -0,0 +1,41 @@
+import pytest
+
+from engine import BOX_MARGINS, PalletLogic, merge_shard_stats, merge_shards
+
+# 병렬 단일 질의: 샤드 결과를 합치면 직렬 find_candidates_np 와 같고, 샤드마다 칸의 약 1/n 만 계산
+
+def params(dims, pallet=(1100, 1100, 1650), block_layers=False, pareto=()):
+    return (dims, 5.0, 100000, 0, BOX_MARGINS[0], 10, 1000, pallet, True, 6, 4, 0, block_layers, pareto)
+
+def run_shards(p, n, top_k=12):
+    parts, stats = [], []
+    for i in range(n):
+        sim = PalletLogic()
+        parts.append(sim.find_candidates_np(*p, top_k=top_k, shard=(i, n)))
+        stats.append(sim.search_stats)
+    return parts, merge_shard_stats(stats)
+
+@pytest.mark.parametrize("n", [2, 3, 4])
+@pytest.mark.parametrize("p", [
+    params([60, 40, 30]),
+    params([180, 120, 50], pallet=(1200, 800, 1500)),
+    params([95.5, 70, 42], pareto=('total', 'sf', 'efficiency')),
+    params([210, 160, 90], block_layers=True),
+])
+def test_merged_shards_match_serial(p, n):
+    ref = [c.to_dict() for c in PalletLogic().find_candidates_np(*p)]
+    parts, _ = run_shards(p, n)
+    assert [c.to_dict() for c in merge_shards(parts, 12, p[13])] == ref
+
+def test_shard_evaluates_its_slice():
+    p = params([25, 20, 15])
+    serial = PalletLogic()
+    serial.find_candidates_np(*p)
+    n = 4
+    _, stats = run_shards(p, n)
+    # 칸 필터 카운터는 공유, 패턴 계산하는 칸은 샤드끼리 겹치지 않고 각 샤드가 약 1/n
+    assert stats['branches'] == serial.search_stats['branches']
+    assert sum(stats['shard_cells']) == stats['branches']
+    for cells in stats['shard_cells']:
+        assert abs(cells - stats['branches'] / n) < 0.2 * stats['branches'] / n
+    assert stats['configs'] == serial.search_stats['configs']
@@ -0,0 +1,33 @@
+import pytest
+
+from engine import BOX_MARGINS, PalletLogic
+
+# 대칭 생략 (같은 (d1, d2, p_H) / 이미 본 칸의 90도 회전 칸) 은 결과를 바꾸지 않음
+
+PRODUCTS = [[180, 120, 50], [100, 100, 60], [80, 80, 80], [95.5, 70, 42], [60, 40, 30]]
+PALLETS = [(1100, 1100, 1650), (1200, 800, 1500)]
+
+def params(dims, pallet, pareto=()):
+    return (dims, 5.0, 100000, 0, BOX_MARGINS[0], 10, 1000, pallet, True, 6, 4, 0, False, pareto)
+
+def search(engine, p, skip, monkeypatch):
+    monkeypatch.setattr(PalletLogic, 'SKIP_SYMMETRY', skip)
+    sim = PalletLogic()
+    return [c.to_dict() for c in getattr(sim, engine)(*p)], sim.search_stats
+
+@pytest.mark.parametrize("engine", ["find_candidates", "find_candidates_np"])
+@pytest.mark.parametrize("pallet", PALLETS)
+@pytest.mark.parametrize("dims", PRODUCTS)
+def test_symmetry_skip_keeps_candidates(engine, dims, pallet, monkeypatch):
+    p = params(dims, pallet)
+    full, full_stats = search(engine, p, False, monkeypatch)
+    skipped, stats = search(engine, p, True, monkeypatch)
+    assert skipped == full
+    assert full_stats['sym_orientations'] == full_stats['sym_cells'] == 0
+    assert stats['sym_cells'] > 0
+    assert stats['cells'] + stats['sym_cells'] < full_stats['cells']
+
+@pytest.mark.parametrize("pallet", PALLETS)
+def test_symmetry_skip_keeps_pareto_front(pallet, monkeypatch):
+    p = params([180, 120, 50], pallet, pareto=('total', 'sf', 'efficiency'))
+    assert search("find_candidates", p, True, monkeypatch)[0] == search("find_candidates", p, False, monkeypatch)[0]
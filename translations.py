@@ -0,0 +1,279 @@
+# ==========================================
+# 다국어 딕셔너리 (app / viz / report 공용)
+# ==========================================
+TRANSLATIONS = {
+    "🇰🇷": {
+        "sidebar_title": "설정",
+        "setting_mgr": "💾 설정 키 관리",
+        "btn_gen_key": "키 생성",
+        "btn_load_key": "키 적용",
+        "key_input_ph": "설정 키",
+        
+        "sec1_title": "1. 제품 정보",
+        "dim_label": "치수 (L,W,H)",
+        "dim_help": "예: 180, 120, 50 (쉼표 구분)",
+        "weight_label": "무게 (g)",
+        "rot_label": "회전",
+        
+        "sec2_title": "2. 입수 설정",
+        "stack_limit_label": "적재제한(단)",
+        "max_box_label": "박스최대(g)",
+        "qty_range_label": "박스 입수량 (최소~최대)",
+        "layer_range_label": "파레트 층당 박스 (최소~최대)",
+        "single_item_label": "단품(1개)",
+        "block_label": "블록 배치 탐색",
+        "block_help": "가로/세로 박스를 섞은 층 배치까지 탐색 (박스 1종당 최대 0.2초)",
+        "pareto_label": "파레토 모드",
+        "pareto_help": "점수 상위 12개 대신 총 수량·안전율(SF)·적재 효율 중 어느 하나라도 더 나은 후보를 모두 표시",
+        "pareto_boxes_label": "박스 수 적은 쪽도 기준에 포함",
+        "pareto_caption": "비지배 후보 {n}건 (총 수량 ↓ 정렬)",
+        "sweep_title": "📐 민감도 분석 (치수/무게 오차)",
+        "sweep_dim_tol": "치수 오차 ± (mm)",
+        "sweep_weight_tol": "무게 오차 ± (%)",
+        "sweep_btn": "분석 실행",
+        "sweep_stability": "1위 유지율",
+        "sweep_kept": "1위 추천 적용 가능",
+        "sweep_points": "계산 지점",
+        "sweep_caption": "칸 = 현재 1위 추천을 해당 치수/무게에 그대로 적용한 결과 (- = 적용 불가, * = 그 지점의 1위가 다름)",
+        "sweep_total_title": "총 수량",
+        "sweep_sf_title": "안전율 (SF)",
+        "sweep_dim_axis": "치수 변화 (mm)",
+        "sweep_weight_axis": "무게 변화",
+        "compare_title": "🧾 파레트 비교",
+        "compare_current": "현재",
+        "compare_pick": "비교할 파레트",
+        "compare_btn": "비교 실행",
+        "compare_pattern": "적재 패턴",
+        "compare_eff": "적재 효율",
+        "compare_caption": "파레트 {n}종 동시 계산 ({ms} ms), 같은 제품/박스 조건",
+        "load_title": "🚚 컨테이너/트럭 적재",
+        "load_vehicle": "차량",
+        "load_mode": "적재 방식",
+        "load_mode_pallet": "파레트",
+        "load_mode_floor": "박스 바닥 적재",
+        "load_units_pallet": "파레트 수",
+        "load_units_floor": "박스 수",
+        "load_kg": "적재 중량 (kg)",
+        "load_rank": "순위",
+        "load_tiers": "단",
+        "load_limit": "제한",
+        "load_limit_floor": "바닥 면적",
+        "load_limit_stack": "박스 강도 (단 수 감소)",
+        "load_limit_height": "높이 초과",
+        "load_limit_payload": "적재 중량",
+        "load_caption": "내측 {dims} mm 기준, 파레트 자체 높이 150 mm / 무게 25 kg, 단적재는 맨 아래 박스 SF 3 이상일 때만",
+        
+        "sec3_title": "3. 외부 설정",
+        "box_thick_label": "박스 두께",
+        "pallet_dim_label": "파레트(L,W,H)",
+        "pallet_dim_help": "예: 1100, 1100, 1650",
+
+        "budget_label": "탐색 시간 제한 (초)",
+        "budget_help": "시간이 다 되면 그때까지 찾은 최선의 옵션을 보여줍니다",
+        "btn_calc": "분석 시작",
+        "err_dim_fmt": "❌ 치수 오류",
+        "success_msg": "✅ 분석 완료! ({n}건)",
+        "stream_progress": "탐색 중... {pct:.0f}% (현재 {n}건)",
+        "partial_msg": "⏱ 시간 제한 도달: 지금까지 찾은 최선 ({n}건)",
+        "partial_caption": "⏱ 지금까지의 최선 (탐색 {pct:.0f}%, 시간 제한을 늘리면 끝까지 탐색)",
+        "err_no_result": "❌ 결과 없음 (조건을 완화해보세요)",
+        "debug_label": "🛠 디버그 정보",
+        "debug_title": "디버그: 단계별 시간 / 탐색 카운터",
+        "debug_last_search": "마지막 분석",
+        "debug_this_run": "이번 화면 갱신",
+        
+        "res_title": "4. 추천 적재 옵션",
+        "opt_label": "옵션 선택",
+        "rank": "순위",
+        "warn": "[위험]",
+        "qty_unit": "입",
+        "box_unit": "박스",
+        "total_label": "총 제품", 
+        "eff": "효율",
+        
+        "detail_title": "📊 상세 리포트",
+        "layout_title": "📐 적재 배열 (가로 x 세로 x 높이)",
+        "unsafe_msg": "🚫 **강도 부족** (SF: {sf})",
+        "safe_msg": "✅ **강도 안전** (SF: {sf})",
+        
+        "t_cat": "구분",
+        "t_dim": "치수 (mm)",
+        "t_cont": "내용",
+        "l_prod_in": "제품(입력)",
+        "l_prod_act": "제품(실제)",
+        "l_box": "박스 외측",
+        "l_load": "파레트 적재",
+        "eff_label": "적재 효율",
+        "load_bottom": "최하단 하중",
+        "bct": "압축강도(BCT)",
+        
+        "res_box_qty": "박스 당 입수",
+        "res_total_box": "총 박스 수량",
+        "res_total_prod": "파레트 총 입수",
+        "layout_in_box": "박스 내부 적재",
+        "layout_on_pallet": "파레트 위 적재",
+        
+        "chart_load_title": "층별 하중 분포 (Load per Layer)",
+        "g_title": "최하단 압축 하중 vs 박스 강도",
+        
+        "viewer_pallet_2d": "🏗️ 파레트 (2D)",
+        "viewer_pallet_3d": "🏗️ 파레트 (3D)",
+        "viewer_box_2d": "📦 박스 내부 (2D)",
+        "viewer_box_3d": "📦 박스 내부 (3D)",
+        "export_caption": "🤖 팔레타이저 배치 파일: 박스 {n}개, 한 줄 = 박스 1개 (아래층부터 놓는 순서), 좌표 mm, rot 1 = 90도 회전",
+        
+        "box_types": ["A골 (5mm)", "B골 (3mm)", "AB골 (8mm)"],
+        "pat_no_int": "No Interlock",
+        "pat_pat_rot": "Pattern Rotation",
+        "pat_box_rot": "Box Rotation",
+        "pat_pinwheel": "Pinwheel",
+        "pat_expanded": "Expanded Pinwheel",
+        "pat_block": "Block Pattern",
+        
+        "btn_gen_pdf": "📄 리포트 생성 (PDF)",
+        "btn_down_pdf": "📥 PDF 다운로드",
+        "pdf_title": "Pallet Simulation Report",
+        "pdf_summary": "1. 시뮬레이션 요약",
+        "pdf_perf": "2. 성능 지표",
+        "pdf_vis": "3. 시뮬레이션 시각화",
+        "msg_font_missing": "⚠️ 한글 폰트 미설치 (영문 출력)",
+        "footer_text": "Generated by Sparkpetkorea Co., LTD"
+    },
+    "🇺🇸": {
+        "sidebar_title": "Settings",
+        "setting_mgr": "💾 Config Key",
+        "btn_gen_key": "Gen Key",
+        "btn_load_key": "Load Key",
+        "key_input_ph": "Paste Key",
+        
+        "sec1_title": "1. Product Info",
+        "dim_label": "Dims (L,W,H)",
+        "dim_help": "e.g. 180, 120, 50",
+        "weight_label": "Wgt (g)",
+        "rot_label": "Rotate",
+        
+        "sec2_title": "2. Qty Settings",
+        "stack_limit_label": "StackLimit",
+        "max_box_label": "BoxMax(g)",
+        "qty_range_label": "Qty inside Box (Min~Max)",
+        "layer_range_label": "Boxes per Layer (Min~Max)",
+        "single_item_label": "Single(1ea)",
+        "block_label": "Block layouts",
+        "block_help": "Also search layers that mix box orientations (up to 0.2 s per box size)",
+        "pareto_label": "Pareto mode",
+        "pareto_help": "Instead of the top 12 by score, list every option not beaten on total qty, safety factor (SF) and efficiency at once",
+        "pareto_boxes_label": "Also prefer fewer boxes",
+        "pareto_caption": "{n} non-dominated options (by total qty)",
+        "sweep_title": "📐 Sensitivity (dim / weight tolerance)",
+        "sweep_dim_tol": "Dim tolerance ± (mm)",
+        "sweep_weight_tol": "Weight tolerance ± (%)",
+        "sweep_btn": "Run sweep",
+        "sweep_stability": "Top pick unchanged",
+        "sweep_kept": "Top pick still fits",
+        "sweep_points": "Points",
+        "sweep_caption": "Cell = current top pick applied at that dim/weight (- = does not fit, * = a different top pick there)",
+        "sweep_total_title": "Total qty",
+        "sweep_sf_title": "Safety factor (SF)",
+        "sweep_dim_axis": "Dim change (mm)",
+        "sweep_weight_axis": "Weight change",
+        "compare_title": "🧾 Pallet comparison",
+        "compare_current": "Current",
+        "compare_pick": "Pallets to compare",
+        "compare_btn": "Compare",
+        "compare_pattern": "Pattern",
+        "compare_eff": "Efficiency",
+        "compare_caption": "{n} pallets computed in parallel ({ms} ms), same product/box settings",
+        "load_title": "🚚 Container / truck loading",
+        "load_vehicle": "Vehicle",
+        "load_mode": "Loading",
+        "load_mode_pallet": "Pallets",
+        "load_mode_floor": "Floor-loaded boxes",
+        "load_units_pallet": "Pallets",
+        "load_units_floor": "Boxes",
+        "load_kg": "Payload (kg)",
+        "load_rank": "Rank",
+        "load_tiers": "Tiers",
+        "load_limit": "Limited by",
+        "load_limit_floor": "Floor area",
+        "load_limit_stack": "Box strength (fewer tiers)",
+        "load_limit_height": "Too tall",
+        "load_limit_payload": "Payload",
+        "load_caption": "Inner {dims} mm; pallet deck 150 mm / 25 kg; stacking only while the bottom box keeps SF >= 3",
+        
+        "sec3_title": "3. External",
+        "box_thick_label": "Thickness",
+        "pallet_dim_label": "Pallet(L,W,H)",
+        "pallet_dim_help": "e.g. 1100, 1100, 1650",
+
+        "budget_label": "Search time limit (s)",
+        "budget_help": "When time runs out, the best options found so far are shown",
+        "btn_calc": "Analyze",
+        "err_dim_fmt": "❌ Invalid Dims",
+        "success_msg": "✅ Done! ({n} opts)",
+        "stream_progress": "Searching... {pct:.0f}% ({n} so far)",
+        "partial_msg": "⏱ Time limit reached: best so far ({n} opts)",
+        "partial_caption": "⏱ Best so far ({pct:.0f}% searched, raise the time limit for a full search)",
+        "err_no_result": "❌ No Result",
+        "debug_label": "🛠 Debug info",
+        "debug_title": "Debug: stage timings / search counters",
+        "debug_last_search": "Last analysis",
+        "debug_this_run": "This rerun",
+        
+        "res_title": "4. Options",
+        "opt_label": "Select Option",
+        "rank": "Rank",
+        "warn": "[Unsafe]",
+        "qty_unit": "ea",
+        "box_unit": "boxes",
+        "total_label": "Total", 
+        "eff": "Eff",
+        
+        "detail_title": "📊 Report",
+        "layout_title": "📐 Layout (L x W x H)",
+        "unsafe_msg": "🚫 **Unsafe** (SF: {sf})",
+        "safe_msg": "✅ **Safe** (SF: {sf})",
+        
+        "t_cat": "Category",
+        "t_dim": "Dims (mm)",
+        "t_cont": "Content",
+        "l_prod_in": "Prod(In)",
+        "l_prod_act": "Prod(Act)",
+        "l_box": "Box(Out)",
+        "l_load": "Pallet Load",
+        "eff_label": "Efficiency",
+        "load_bottom": "Bottom Load",
+        "bct": "Box BCT",
+        
+        "res_box_qty": "Qty per Box",
+        "res_total_box": "Total Boxes",
+        "res_total_prod": "Total Products",
+        "layout_in_box": "Inside Box",
+        "layout_on_pallet": "On Pallet",
+        
+        "chart_load_title": "Load Distribution per Layer",
+        "g_title": "Bottom Load vs Box Strength",
+        
+        "viewer_pallet_2d": "🏗️ Pallet (2D)",
+        "viewer_pallet_3d": "🏗️ Pallet (3D)",
+        "viewer_box_2d": "📦 Inside (2D)",
+        "viewer_box_3d": "📦 Inside (3D)",
+        "export_caption": "🤖 Palletizer placement file: {n} boxes, one row per box (bottom layer first, in placing order), mm, rot 1 = turned 90°",
+        
+        "box_types": ["A-Flute (5mm)", "B-Flute (3mm)", "AB-Flute (8mm)"],
+        "pat_no_int": "No Interlock",
+        "pat_pat_rot": "Pattern Rotation",
+        "pat_box_rot": "Box Rotation",
+        "pat_pinwheel": "Pinwheel",
+        "pat_expanded": "Expanded Pinwheel",
+        "pat_block": "Block Pattern",
+        
+        "btn_gen_pdf": "📄 Generate PDF Report",
+        "btn_down_pdf": "📥 Download PDF",
+        "pdf_title": "Pallet Simulation Report",
+        "pdf_summary": "1. Summary",
+        "pdf_perf": "2. Performance",
+        "pdf_vis": "3. Visualization",
+        "msg_font_missing": "",
+        "footer_text": "Generated by Sparkpetkorea Co., LTD"
+    }
+}
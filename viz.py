@@ -0,0 +1,230 @@
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+import plotly.graph_objects as go
+from engine import add_ms, fmt
+from geometry import DX, DY, DZ, LAYER, X, Y, Z, layer_of, pallet_placements, product_placements
+from translations import TRANSLATIONS
+
+# Plotly 그림 (app 에서 그림이 처음 필요할 때 임포트)
+
+# ==========================================
+# 1. 시각화 함수
+# ==========================================
+# 박스 n개를 한 번에: boxes = [(x, y, z, dx, dy, dz), ...]
+CUBE_VX = np.array([0, 1, 1, 0, 0, 1, 1, 0])
+CUBE_VY = np.array([0, 0, 1, 1, 0, 0, 1, 1])
+CUBE_VZ = np.array([0, 0, 0, 0, 1, 1, 1, 1])
+CUBE_I = np.array([7, 0, 0, 0, 4, 4, 6, 6, 4, 0, 3, 2], dtype=np.int32)
+CUBE_J = np.array([3, 4, 1, 2, 5, 6, 5, 2, 0, 1, 6, 3], dtype=np.int32)
+CUBE_K = np.array([0, 7, 2, 3, 6, 7, 1, 1, 5, 5, 7, 6], dtype=np.int32)
+# 모서리 12개를 4개의 선분으로, nan = 선 끊김 (박스 사이 구분 포함)
+_N = np.nan
+WIRE_X = np.array([0, 1, 1, 0, 0, _N, 0, 1, 1, 0, 0, _N, 1, 1, _N, 1, 1, _N, 0, 0, _N])
+WIRE_Y = np.array([0, 0, 1, 1, 0, _N, 0, 0, 1, 1, 0, _N, 0, 0, _N, 1, 1, _N, 1, 1, _N])
+WIRE_Z = np.array([0, 0, 0, 0, 0, _N, 1, 1, 1, 1, 1, _N, 0, 1, _N, 0, 1, _N, 0, 1, _N])
+
+def create_cube_mesh(boxes, color, opacity=1.0):
+    x, y, z, dx, dy, dz = np.asarray(boxes, dtype=float).reshape(-1, 6).T[:, :, None]
+    offsets = (np.arange(x.shape[0], dtype=np.int32) * 8)[:, None]
+    # float32/int32 로 보내야 JSON(base64) 크기가 작음
+    return go.Mesh3d(x=(x + dx * CUBE_VX).astype(np.float32).ravel(), y=(y + dy * CUBE_VY).astype(np.float32).ravel(),
+                     z=(z + dz * CUBE_VZ).astype(np.float32).ravel(),
+                     i=(CUBE_I + offsets).ravel(), j=(CUBE_J + offsets).ravel(), k=(CUBE_K + offsets).ravel(),
+                     color=color, opacity=opacity, flatshading=True, lighting=dict(ambient=0.5, diffuse=0.8), hoverinfo='skip')
+
+def draw_wireframe(boxes):
+    x, y, z, dx, dy, dz = np.asarray(boxes, dtype=float).reshape(-1, 6).T[:, :, None]
+    return go.Scatter3d(x=(x + dx * WIRE_X).astype(np.float32).ravel(), y=(y + dy * WIRE_Y).astype(np.float32).ravel(),
+                        z=(z + dz * WIRE_Z).astype(np.float32).ravel(),
+                        mode='lines', line=dict(color='black', width=2), showlegend=False, hoverinfo='skip')
+
+# 사각형 n개를 채움 trace 1개 + 라벨 trace 1개로: rects = [(x, y, dx, dy), ...]
+RECT_X = np.array([0, 1, 1, 0, 0, _N])
+RECT_Y = np.array([0, 0, 1, 1, 0, _N])
+
+def draw_rects(rects, fillcolor, line_color, hover_prefix):
+    x, y, dx, dy = np.asarray(rects, dtype=float).reshape(-1, 4).T[:, :, None]
+    labels = [str(i + 1) for i in range(x.shape[0])]
+    outline = go.Scatter(x=(x + dx * RECT_X).astype(np.float32).ravel(), y=(y + dy * RECT_Y).astype(np.float32).ravel(),
+                         fill="toself", fillcolor=fillcolor, line=dict(color=line_color, width=1), mode='lines',
+                         showlegend=False, hoverinfo='skip')
+    text = go.Scatter(x=(x + dx / 2).astype(np.float32).ravel(), y=(y + dy / 2).astype(np.float32).ravel(),
+                      mode='text', text=labels, textposition="middle center", showlegend=False,
+                      hoverinfo='text', hovertext=[f"{hover_prefix} {s}" for s in labels])
+    return [outline, text]
+
+def get_pallet_2d_fig(res, pl_L, pl_W):
+    fig = go.Figure()
+    fig.add_shape(type="rect", x0=0, y0=0, x1=pl_L, y1=pl_W, line=dict(color="black", width=3))
+    rects = layer_of(pallet_placements(res, pl_L, pl_W), 0)[:, [X, Y, DX, DY]]
+    fig.add_traces(draw_rects(rects, "#85C1E9", "blue", "Box"))
+    
+    fig.update_layout(xaxis=dict(range=[-50, pl_L+50], showgrid=False, zeroline=False, visible=True), yaxis=dict(range=[-50, pl_W+50], showgrid=False, zeroline=False, visible=True, scaleanchor="x", scaleratio=1), margin=dict(l=20, r=20, b=20, t=20), height=350, plot_bgcolor="white")
+    return fig
+
+def shrink(placements, gap):
+    # 박스 사이가 보이도록 (x, y, z, dx, dy, dz) 의 크기만 gap 만큼 줄임
+    boxes = placements[:, [X, Y, Z, DX, DY, DZ]]
+    boxes[:, 3:] -= gap
+    return boxes
+
+def get_pallet_3d_fig(res, pl_L, pl_W):
+    fig = go.Figure()
+    placements = pallet_placements(res, pl_L, pl_W)
+    c_blue, c_red = '#355C7D', '#C06C84'
+    boxes = shrink(placements, 2)
+    even = (placements[:, LAYER] % 2 == 0)
+    blue_boxes, red_boxes = boxes[even], boxes[~even]
+    if len(blue_boxes): fig.add_trace(create_cube_mesh(blue_boxes, c_blue))
+    if len(red_boxes): fig.add_trace(create_cube_mesh(red_boxes, c_red))
+    fig.add_trace(draw_wireframe(np.vstack([[(0, 0, 0, pl_L, pl_W, 0)], blue_boxes, red_boxes])))
+            
+    camera = dict(eye=dict(x=1.5, y=1.5, z=1.5))
+    fig.update_layout(height=350, showlegend=False, scene=dict(aspectmode='data', camera=camera), margin=dict(l=0, r=0, b=0, t=0))
+    return fig
+
+def get_prod_layer_2d_fig(res):
+    fig = go.Figure()
+    in_L, in_W, in_H = res['box_inner']
+    
+    fig.add_shape(type="rect", x0=0, y0=0, x1=in_L, y1=in_W, line=dict(color="black", width=3))
+    rects = layer_of(product_placements(res), 0)[:, [X, Y, DX, DY]]
+    fig.add_traces(draw_rects(rects, "#F9E79F", "orange", "Prod"))
+    fig.update_layout(xaxis=dict(range=[-10, in_L+10], showgrid=False, zeroline=False, visible=True), yaxis=dict(range=[-10, in_W+10], showgrid=False, zeroline=False, visible=True, scaleanchor="x", scaleratio=1), margin=dict(l=20, r=20, b=20, t=20), height=350, plot_bgcolor="white")
+    return fig
+
+def get_prod_3d_fig(res):
+    fig = go.Figure()
+    in_L, in_W, in_H = res['box_inner']
+    placements = product_placements(res)
+    prods = shrink(placements, 1)
+    prods[:, :3] += 0.5
+    even_layer = (placements[:, LAYER] % 2 == 0)
+    for color, sel in (('#F5B7B1', even_layer), ('#D2B4DE', ~even_layer)):
+        if sel.any(): fig.add_trace(create_cube_mesh(prods[sel], color))
+    fig.add_trace(draw_wireframe(np.vstack([[(0, 0, 0, in_L, in_W, in_H)], prods])))
+    camera = dict(eye=dict(x=1.5, y=1.5, z=1.5))
+    fig.update_layout(height=350, showlegend=False, scene=dict(aspectmode='data', camera=camera), margin=dict(l=0, r=0, b=0, t=0))
+    return fig
+
+def get_gauge_fig(res, t):
+    st_data = res['strength']
+    fig_gauge = go.Figure(go.Indicator(
+        mode = "gauge+number+delta", value = st_data['load'],
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': t['g_title'], 'font': {'size': 14}},
+        delta = {'reference': st_data['bct']/3, 'increasing': {'color': "red"}},
+        gauge = {
+            'axis': {'range': [None, st_data['bct']], 'tickwidth': 1},
+            'bar': {'color': "#2E86C1"},
+            'steps': [{'range': [0, st_data['bct']/3], 'color': "#D4EFDF"}, {'range': [st_data['bct']/3, st_data['bct']], 'color': "#FADBD8"}],
+            'threshold': {'line': {'color': "red", 'width': 4}, 'thickness': 0.75, 'value': st_data['bct']/3}
+        }
+    ))
+    fig_gauge.update_layout(height=300, margin=dict(l=20, r=20, t=50, b=20))
+    return fig_gauge
+
+def get_load_fig(res, t):
+    layers = res['p_layers']
+    layer_weight = res['weight'] * res['yield_per_layer']
+    layer_nums = list(range(1, layers + 1))
+    layer_loads = [(layers - i) * layer_weight for i in layer_nums]
+    
+    fig_load = go.Figure(go.Bar(
+        x=layer_nums, 
+        y=layer_loads,
+        text=[f"{fmt(l)}kg" for l in layer_loads],
+        textposition='auto',
+        marker_color='#E74C3C'
+    ))
+    fig_load.update_layout(
+        title=t['chart_load_title'],
+        xaxis_title="Layer (1=Bottom)",
+        yaxis_title="Load (kg)",
+        height=300,
+        margin=dict(l=20, r=20, t=50, b=20)
+    )
+    return fig_load
+
+def get_sweep_heatmap_fig(sweep, metric, t):
+    # 기준 추천을 각 (치수, 무게) 점에 그대로 적용한 결과 (안 맞으면 빈 칸), 1위가 바뀐 점은 * 표시
+    key = 'nominal_total' if metric == 'total' else 'nominal_sf'
+    z, text = [], []
+    for row in sweep['grid']:
+        z.append([p[key] for p in row])
+        text.append([("-" if p[key] is None else fmt(round(p[key], 1))) + ("" if p['same_top'] else " *") for p in row])
+    fig = go.Figure(go.Heatmap(
+        z=z, text=text, texttemplate="%{text}",
+        x=[f"{d:+g}" for d in sweep['dim_deltas']],
+        y=[f"{w * 100:+g}%" for w in sweep['weight_steps']],
+        colorscale='RdYlGn' if metric == 'sf' else 'Blues',
+        zmid=3.0 if metric == 'sf' else None, hoverongaps=False,
+    ))
+    fig.update_layout(
+        title=t['sweep_total_title'] if metric == 'total' else t['sweep_sf_title'],
+        xaxis_title=t['sweep_dim_axis'], yaxis_title=t['sweep_weight_axis'],
+        xaxis=dict(type='category'), yaxis=dict(type='category'),
+        height=300, margin=dict(l=20, r=20, t=50, b=20)
+    )
+    return fig
+
+# ==========================================
+# 2. 그림 캐시 (후보 + 파레트 치수 기준, 서버 전체 공유)
+# ==========================================
+FIGURE_BUILDERS = {
+    'pallet_2d': lambda res, pl, t: get_pallet_2d_fig(res, pl[0], pl[1]),
+    'pallet_3d': lambda res, pl, t: get_pallet_3d_fig(res, pl[0], pl[1]),
+    'prod_2d': lambda res, pl, t: get_prod_layer_2d_fig(res),
+    'prod_3d': lambda res, pl, t: get_prod_3d_fig(res),
+    'gauge': lambda res, pl, t: get_gauge_fig(res, t),
+    'load': lambda res, pl, t: get_load_fig(res, t),
+}
+
+def figure_nbytes(fig):
+    n = 0
+    for tr in fig.data:
+        n += 2048
+        for v in tr.to_plotly_json().values():
+            if hasattr(v, 'nbytes'): n += v.nbytes
+            elif isinstance(v, (list, tuple)): n += 16 * len(v)
+    return n
+
+class FigureCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._figs = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind, res, pallet_dims, lang_code, stats=None):
+        # 제목에 언어가 들어가는 그림만 언어별로 따로 보관
+        lang = lang_code if kind in ('gauge', 'load') else None
+        pallet = tuple(pallet_dims[:2]) if kind.startswith('pallet') else None
+        key = (kind, res.fingerprint(), pallet, lang)
+        with self._lock:
+            entry = self._figs.get(key)
+            if entry is not None:
+                self._figs.move_to_end(key)
+                self.hits += 1
+                if stats is not None: stats['fig_hits'] = stats.get('fig_hits', 0) + 1
+                return entry[0]
+            self.misses += 1
+
+        t0 = time.perf_counter()
+        fig = FIGURE_BUILDERS[kind](res, pallet_dims, TRANSLATIONS[lang_code])
+        size = figure_nbytes(fig)
+        if stats is not None:
+            stats['fig_misses'] = stats.get('fig_misses', 0) + 1
+            add_ms(stats, 'fig_' + kind, time.perf_counter() - t0)
+        with self._lock:
+            if key not in self._figs:
+                self._figs[key] = (fig, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes and len(self._figs) > 1:
+                    _, (_, old_size) = self._figs.popitem(last=False)
+                    self._bytes -= old_size
+        return fig
@@ -0,0 +1,157 @@
+import argparse
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# 파레트 바닥(pl_L x pl_W)별 층 적재 테이블: 정수 박스 바닥 (L, W) -> 격자/핀휠 결과
+# python yield_table.py                      # 표준 파레트 미리 생성
+# python yield_table.py 1140,1140 --dir DIR  # 임의 크기
+#
+# 필드 (T[필드][L, W], L/W 는 0..max(pl_L, pl_W)):
+#   nx, ny  : 격자 (L 을 pl_L 방향으로) 개수 = pl_L // L, pl_W // W
+#   kmax    : 핀휠 최대 k (L + k*W <= 짧은 변, k <= L//W + 3), 없으면 0
+#   best    : 두 방향 격자 / 두 방향 핀휠 중 최대 층당 개수
+#   pattern : best 의 패턴 (0 격자, 1 핀휠, 동률이면 격자)
+#
+# 크기 제한: 긴 변이 MAX_TABLE_SIDE 넘으면 테이블 없음 (엔진이 직접 계산, 3000x3000 이면 ~100 MB)
+# 프로세스당 MAX_OPEN 개까지 열어 둠 (LRU), 디렉터리는 MAX_DIR_BYTES 넘으면 오래 안 쓴 파일부터 지움
+
+STANDARD_PALLETS = [(1100, 1100), (1200, 800), (1200, 1000), (1219, 1016)]
+TABLE_DTYPE = np.dtype([('nx', '<u2'), ('ny', '<u2'), ('kmax', '<u2'), ('best', '<u4'), ('pattern', 'u1')])
+TABLE_VERSION = 1
+TABLE_DIR = os.environ.get("PALLET_TABLE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "pallet_tables")
+MAX_TABLE_SIDE = 1600
+MAX_OPEN = 8
+MAX_DIR_BYTES = 256 * 1024 * 1024
+
+_tables = OrderedDict()
+_lock = threading.Lock()
+
+# ==========================================
+# 1. 생성
+# ==========================================
+def build_table(pl_L, pl_W):
+    size = max(pl_L, pl_W) + 1
+    L = np.arange(size, dtype=np.int64)[:, None]
+    W = np.arange(size, dtype=np.int64)[None, :]
+    L1 = np.maximum(L, 1)
+    W1 = np.maximum(W, 1)
+    valid = (L > 0) & (W > 0)
+
+    nx = np.where(valid, pl_L // L1, 0)
+    ny = np.where(valid, pl_W // W1, 0)
+    short_pl = min(pl_L, pl_W)
+    kmax = np.minimum(L1 // W1 + 3, (short_pl - L) // W1)
+    kmax = np.where(valid & (kmax > 0), kmax, 0)
+
+    grid = np.maximum(nx * ny, (nx * ny).T)
+    pin = 4 * np.maximum(kmax, kmax.T)
+    table = np.zeros((size, size), dtype=TABLE_DTYPE)
+    table['nx'] = nx
+    table['ny'] = ny
+    table['kmax'] = kmax
+    table['best'] = np.maximum(grid, pin)
+    table['pattern'] = pin > grid
+    return table
+
+def table_path(pl_L, pl_W, table_dir=None):
+    return os.path.join(table_dir or TABLE_DIR, f"yield_v{TABLE_VERSION}_{pl_L}x{pl_W}.npy")
+
+def write_table(pl_L, pl_W, table_dir=None):
+    table_dir = table_dir or TABLE_DIR
+    os.makedirs(table_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=table_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, build_table(pl_L, pl_W))
+        os.replace(tmp_path, table_path(pl_L, pl_W, table_dir))
+    except BaseException:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+        raise
+    return table_path(pl_L, pl_W, table_dir)
+
+# ==========================================
+# 2. 조회 (프로세스당 1회 mmap, 없으면 만들어서 저장)
+# ==========================================
+def get_table(pl_L, pl_W, table_dir=None):
+    # 정수 바닥 치수, 긴 변 MAX_TABLE_SIDE 이하만 (아니면 None -> 엔진이 직접 계산)
+    if int(pl_L) != pl_L or int(pl_W) != pl_W or pl_L <= 0 or pl_W <= 0: return None
+    if max(pl_L, pl_W) > MAX_TABLE_SIDE: return None
+    key = (int(pl_L), int(pl_W), table_dir)
+    with _lock:
+        table = _tables.get(key)
+        if table is not None:
+            _tables.move_to_end(key)
+            return table
+        table = _tables[key] = _open(key[0], key[1], table_dir)
+        while len(_tables) > MAX_OPEN: _tables.popitem(last=False)
+    return table
+
+def _open(pl_L, pl_W, table_dir):
+    path = table_path(pl_L, pl_W, table_dir)
+    try:
+        if os.path.exists(path):
+            os.utime(path)  # 최근 사용 표시 (정리 순서)
+        else:
+            write_table(pl_L, pl_W, table_dir)
+            prune_dir(table_dir or TABLE_DIR, keep=path)
+        table = np.load(path, mmap_mode='r')
+        if table.dtype == TABLE_DTYPE and table.shape == (max(pl_L, pl_W) + 1,) * 2: return table
+    except (OSError, ValueError):
+        pass
+    return build_table(pl_L, pl_W)  # 디스크를 못 쓰면 메모리에만
+
+def prune_dir(table_dir, max_bytes=None, keep=None):
+    # 테이블 파일 합계가 max_bytes 넘으면 mtime 오래된 것부터 삭제 (방금 쓴 keep 은 남김)
+    files = []
+    try:
+        with os.scandir(table_dir) as it:
+            for e in it:
+                if not (e.name.startswith("yield_v") and e.name.endswith(".npy")) or e.path == keep: continue
+                try:
+                    st = e.stat()
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, e.path))
+        total = sum(f[1] for f in files) + (os.path.getsize(keep) if keep else 0)
+    except OSError:
+        return
+    max_bytes = MAX_DIR_BYTES if max_bytes is None else max_bytes
+    for _, size, path in sorted(files):
+        if total <= max_bytes: break
+        try:
+            os.remove(path)  # 다른 프로세스가 mmap 중이어도 열린 쪽은 그대로 읽힘
+        except OSError:
+            continue
+        total -= size
+
+def lookup(table, L, W):
+    # L, W: 정수 스칼라 또는 정수 배열, 범위 밖이면 None
+    if table is None: return None
+    if isinstance(L, np.ndarray):
+        if L.dtype.kind not in 'iu' or W.dtype.kind not in 'iu': return None
+        if L.size and (L.min() < 0 or W.min() < 0 or L.max() >= table.shape[0] or W.max() >= table.shape[1]): return None
+    elif int(L) != L or int(W) != W or not (0 <= L < table.shape[0] and 0 <= W < table.shape[1]):
+        return None
+    else:
+        L, W = int(L), int(W)  # 211.0 처럼 정수값 float
+    return table[L, W]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Prebuild per-pallet layer yield tables")
+    ap.add_argument("pallets", nargs="*", help="pallet floor as L,W (default: standard pallets)")
+    ap.add_argument("--dir", default=None, help=f"output directory (default: {TABLE_DIR})")
+    args = ap.parse_args(argv)
+
+    pallets = [tuple(int(v) for v in p.replace("x", ",").split(",")[:2]) for p in args.pallets] or STANDARD_PALLETS
+    for pl_L, pl_W in pallets:
+        if max(pl_L, pl_W) > MAX_TABLE_SIDE: ap.error(f"{pl_L}x{pl_W}: side over {MAX_TABLE_SIDE} (no table is used)")
+        path = write_table(pl_L, pl_W, args.dir)
+        print(f"{pl_L}x{pl_W}: {path} ({os.path.getsize(path) / 1e6:.1f} MB)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())